@@ -1,6 +1,6 @@
 from flask import Blueprint, request, jsonify, render_template
 from utils.rate_limit import rate_limit
-from utils.auth import validate_agent_name
+from utils.auth import validate_agent_name, generate_api_key, hash_api_key
 
 
 agents_bp = Blueprint('agents', __name__)
@@ -50,18 +50,9 @@ def join_collective():
     except:
         pass
     
-    # Create API key
-    import secrets
-    raw_api_key = secrets.token_hex(32)
-    
-    # Hash API key with Argon2
-    from app import ph
-    if ph:
-        hashed_key = ph.hash(raw_api_key)
-    else:
-        # Fallback to Werkzeug if Argon2 is missing for some reason
-        from werkzeug.security import generate_password_hash
-        hashed_key = generate_password_hash(raw_api_key, method='pbkdf2:sha256')
+    # Create API key with a public identifier prefix for O(1) lookups
+    raw_api_key, key_id = generate_api_key()
+    hashed_key = hash_api_key(raw_api_key)
         
     # Create agent
     try:
@@ -69,6 +60,7 @@ def join_collective():
             'name': name,
             'faction': faction,
             'api_key': hashed_key,
+            'key_id': key_id,
             'xp': 0,
             'level': 1
         }).execute()
@@ -84,6 +76,80 @@ def join_collective():
     except Exception as e:
         return jsonify({'error': f'Failed to create agent: {str(e)}'}), 500
 
+@agents_bp.route('/api/agent/rotate-key', methods=['POST'])
+@rate_limit(10, per=3600)
+def rotate_api_key():
+    """Replace the caller's API key with a new prefixed key (migrates legacy keys)"""
+    from app import supabase
+    from utils.auth import verify_api_key, get_principal, forget_credentials, SESSION_TOKEN_TTL
+    
+    if not supabase:
+        return jsonify({'error': 'Database not configured'}), 503
+    
+    api_key = request.headers.get('X-API-KEY')
+    if not api_key:
+        return jsonify({'error': 'API key required'}), 401
+    
+    agent_name = verify_api_key(api_key)
+    if not agent_name:
+        return jsonify({'error': 'Invalid API key'}), 401
+    
+    # Only the agent's own key can rotate it - not the master key or a session token
+    principal = get_principal(agent_name)
+    if principal is None or principal['via'] != 'key':
+        return jsonify({'error': 'Rotate with your own API key'}), 400
+    
+    raw_api_key, key_id = generate_api_key()
+    
+    try:
+        supabase.table('agents').update({
+            'api_key': hash_api_key(raw_api_key),
+            'key_id': key_id
+        }).eq('name', agent_name).execute()
+    except Exception as e:
+        return jsonify({'error': f'Failed to rotate key: {str(e)}'}), 500
+    
+    forget_credentials(agent_name)
+    
+    return jsonify({
+        'message': (f'API key rotated for {agent_name}. The previous key no longer works; '
+                    f'session tokens issued from it stay valid until they expire '
+                    f'(at most {SESSION_TOKEN_TTL // 60} minutes).'),
+        'agent': agent_name,
+        'api_key': raw_api_key
+    })
+
+@agents_bp.route('/api/auth/token', methods=['POST'])
+@rate_limit(100, per=3600)
+def issue_token():
+    """Exchange a verified API key for a short-lived signed session token"""
+    from app import supabase
+    from utils.auth import verify_api_key, get_principal, issue_session_token, SESSION_TOKEN_TTL
+    
+    if not supabase:
+        return jsonify({'error': 'Database not configured'}), 503
+    
+    api_key = request.headers.get('X-API-KEY')
+    if not api_key:
+        return jsonify({'error': 'API key required'}), 401
+    
+    agent_name = verify_api_key(api_key)
+    if not agent_name:
+        return jsonify({'error': 'Invalid API key'}), 401
+    
+    # Tokens are minted from the agent's own key only - no refreshing a token with itself
+    principal = get_principal(agent_name)
+    if principal is None or principal['via'] != 'key':
+        return jsonify({'error': 'Session tokens are issued for agent API keys only'}), 400
+    
+    token, expires_at = issue_session_token(agent_name, principal['roles'])
+    return jsonify({
+        'agent': agent_name,
+        'token': token,
+        'expires_at': expires_at,
+        'expires_in': SESSION_TOKEN_TTL
+    })
+
 @agents_bp.route('/api/agent/<agent_name>', methods=['GET'])
 @rate_limit(100, per=3600)
 def get_agent_profile(agent_name):
@@ -109,7 +175,7 @@ def get_agent_profile(agent_name):
         # We'll allow public profile fetches if no key provided (for public UI)
         # But if a key IS provided (agent-terminal login), we must verify it matches
         if api_key:
-            auth_agent = verify_api_key(api_key, agent_name)
+            auth_agent = verify_api_key(api_key, agent_name, allow_token=True)
             if auth_agent and auth_agent != agent_name:
                 return jsonify({'error': 'Invalid API Key for this agent'}), 401
                 
@@ -77,7 +77,7 @@ def cast_vote():
     if not api_key:
         return jsonify({'error': 'Unauthorized'}), 401
     
-    agent_name = verify_api_key(api_key)
+    agent_name = verify_api_key(api_key, allow_token=True)
     if not agent_name:
         return jsonify({'error': 'Invalid API key'}), 401
     
@@ -183,12 +183,11 @@ def cast_vote():
                 try:
                     import threading
                     from services.github import sync_signals_to_db
-                    from utils.cache import invalidate_cache
+                    from utils.cache import invalidate_tag
                     
                     def sync_and_invalidate():
                         sync_signals_to_db()
-                        invalidate_cache('stats_data')
-                        invalidate_cache('github_stats')
+                        invalidate_tag('signals')
                         print(f"STATS SYNC: Completed sync and cache invalidation after merge of PR #{pr_number}", flush=True)
 
                     sync_thread = threading.Thread(target=sync_and_invalidate, daemon=True)
@@ -227,12 +226,11 @@ def cast_vote():
                 try:
                     import threading
                     from services.github import sync_signals_to_db
-                    from utils.cache import invalidate_cache
+                    from utils.cache import invalidate_tag
                     
                     def sync_and_invalidate_reject():
                         sync_signals_to_db()
-                        invalidate_cache('stats_data')
-                        invalidate_cache('github_stats')
+                        invalidate_tag('signals')
                         print(f"STATS SYNC: Completed sync and cache invalidation after rejection of PR #{pr_number}", flush=True)
 
                     sync_thread = threading.Thread(target=sync_and_invalidate_reject, daemon=True)
@@ -110,7 +110,7 @@ def create_proposal():
     if not api_key:
         return jsonify({'error': 'Unauthorized'}), 401
     
-    agent_name = verify_api_key(api_key)
+    agent_name = verify_api_key(api_key, allow_token=True)
     if not agent_name:
         return jsonify({'error': 'Invalid API key'}), 401
     
@@ -173,7 +173,7 @@ def vote_proposal():
     if not api_key:
         return jsonify({'error': 'Unauthorized'}), 401
     
-    agent_name = verify_api_key(api_key)
+    agent_name = verify_api_key(api_key, allow_token=True)
     if not agent_name:
         return jsonify({'error': 'Invalid API key'}), 401
     
@@ -207,8 +207,13 @@ def vote_proposal():
         # Calculate voting power (weight)
         # Formula: sqrt(XP / 100)
         import math
-        agent_res = supabase.table('agents').select('xp').eq('name', agent_name).execute()
-        agent_xp = float(agent_res.data[0]['xp']) if agent_res.data else 0.0
+        from utils.auth import get_principal
+        principal = get_principal(agent_name)
+        if principal is not None and principal['xp'] is not None:
+            agent_xp = principal['xp']
+        else:
+            agent_res = supabase.table('agents').select('xp').eq('name', agent_name).execute()
+            agent_xp = float(agent_res.data[0]['xp']) if agent_res.data else 0.0
         
         # Power is curved: sqrt of (XP divided by 100)
         # e.g., 100 XP = 1.0 power, 400 XP = 2.0 power, 900 XP = 3.0 power
@@ -285,7 +290,7 @@ def add_comment(proposal_id=None):
     if not api_key:
         return jsonify({'error': 'Unauthorized'}), 401
     
-    agent_name = verify_api_key(api_key)
+    agent_name = verify_api_key(api_key, allow_token=True)
     if not agent_name:
         return jsonify({'error': 'Invalid API key'}), 401
     
@@ -325,8 +330,13 @@ def add_comment(proposal_id=None):
         
         # Calculate weight (Voting Power) at time of comment
         import math
-        agent_res = supabase.table('agents').select('xp').eq('name', agent_name).execute()
-        agent_xp = float(agent_res.data[0]['xp']) if agent_res.data else 0.0
+        from utils.auth import get_principal
+        principal = get_principal(agent_name)
+        if principal is not None and principal['xp'] is not None:
+            agent_xp = principal['xp']
+        else:
+            agent_res = supabase.table('agents').select('xp').eq('name', agent_name).execute()
+            agent_xp = float(agent_res.data[0]['xp']) if agent_res.data else 0.0
         weight = math.sqrt(agent_xp / 100.0)
         if agent_xp > 0 and weight < 0.01:
             weight = 0.01
@@ -363,7 +373,7 @@ def implement_proposal():
     if not api_key:
         return jsonify({'error': 'Unauthorized'}), 401
     
-    agent_name = verify_api_key(api_key)
+    agent_name = verify_api_key(api_key, allow_token=True)
     if not agent_name:
         return jsonify({'error': 'Invalid API key'}), 401
     
@@ -416,7 +426,7 @@ def check_expired_proposals():
     if not api_key:
         return jsonify({'error': 'Unauthorized'}), 401
         
-    agent_name = verify_api_key(api_key)
+    agent_name = verify_api_key(api_key, allow_token=True)
     if not agent_name:
         return jsonify({'error': 'Invalid API key'}), 401
         
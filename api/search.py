@@ -0,0 +1,31 @@
+from flask import Blueprint, request, jsonify
+from utils.rate_limit import rate_limit
+from utils.auth import safe_error
+
+search_bp = Blueprint('search', __name__)
+
+MAX_QUERY_LENGTH = 200
+
+@search_bp.route('/api/search', methods=['GET'])
+@rate_limit(300, per=3600)
+def search_archive():
+    """Full-text search over issues, special issues, blog posts and submissions"""
+    from utils.search import search, SECTIONS, SEARCH_MAX_PER_PAGE
+    
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'error': 'Missing query parameter: q'}), 400
+    if len(query) > MAX_QUERY_LENGTH:
+        return jsonify({'error': f'Query too long (max {MAX_QUERY_LENGTH} characters)'}), 400
+    
+    section = request.args.get('type')
+    if section and section not in SECTIONS:
+        return jsonify({'error': f"Invalid type. Use one of: {', '.join(SECTIONS)}"}), 400
+    
+    page = request.args.get('page', 1, type=int)
+    per_page = min(request.args.get('per_page', 10, type=int), SEARCH_MAX_PER_PAGE)
+    
+    try:
+        return jsonify(search(query, page=page, per_page=per_page, section=section))
+    except Exception as e:
+        return safe_error(e)
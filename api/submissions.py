@@ -4,6 +4,7 @@ import re
 import time
 import hmac
 import hashlib
+import threading
 from utils.rate_limit import rate_limit
 submissions_bp = Blueprint('submissions', __name__)
 
@@ -46,7 +47,7 @@ def submit():
     if not api_key:
         return jsonify({'error': 'Unauthorized'}), 401
 
-    agent_name = verify_api_key(api_key)
+    agent_name = verify_api_key(api_key, allow_token=True)
     if not agent_name:
         return jsonify({'error': 'Invalid API key'}), 401
 
@@ -136,13 +137,11 @@ def submit():
         # Trigger proactive synchronous sync and cache invalidation
         try:
             from services.github import sync_single_pr
-            from utils.cache import invalidate_cache
+            from utils.cache import invalidate_tag
             
             # Fast synchronous sync for the specific PR
             sync_single_pr(pr.number)
-            invalidate_cache('signals_cache')
-            invalidate_cache('stats_data')
-            invalidate_cache('github_stats')
+            invalidate_tag('signals')
             print(f"PROACTIVE SYNC: Completed synchronous sync for new PR #{pr.number}", flush=True)
         except Exception as e:
             print(f"PROACTIVE SYNC ERROR: {e}", flush=True)
@@ -214,14 +213,16 @@ def github_webhook():
             # Trigger synchronous sync and cache invalidation
             try:
                 from services.github import sync_single_pr
-                from utils.cache import invalidate_cache
+                from utils.cache import invalidate_tag
                 
                 # Fast synchronous sync for the specific PR
                 sync_single_pr(pr_number)
-                invalidate_cache('signals_cache')
-                invalidate_cache('stats_data')
-                invalidate_cache('github_stats')
+                invalidate_tag('signals')
                 print(f"WEBHOOK SYNC: Completed synchronous sync for PR #{pr_number}", flush=True)
+                
+                # Rebuild the stats caches off the request path so GitHub gets a fast 200
+                from utils.warmup import warm_caches
+                threading.Thread(target=warm_caches, args=(['github_stats', 'stats_data'],), daemon=True).start()
             except Exception as e:
                 print(f"WEBHOOK SYNC ERROR: {e}", flush=True)
 
@@ -19,6 +19,7 @@ from api.curation import curation_bp
 from api.submissions import submissions_bp
 from api.proposals import proposals_bp
 from api.issues import issues_bp
+from api.search import search_bp
 
 # Load environment
 basedir = os.path.abspath(os.path.dirname(__file__))
@@ -72,24 +73,30 @@ VERSION = _parse_protocol_version()
 def inject_version():
     return dict(site_version=f"Protocol v{VERSION}")
 
-import markdown
+def _markdown_to_safe_html(text):
+    # 1. Convert markdown to HTML (pooled engine, see utils/markup.py)
+    from utils.markup import markdown_to_html
+    html = markdown_to_html(text)
+    
+    # 2. SECURITY: Sanitize the resulting HTML using centralized logic
+    from utils.security import sanitize_html
+    return sanitize_html(html)
 
+# Proposal descriptions, comments and bios repeat across page views - both
+# filters are memoized by content hash (bounded LRU in utils/markup.py)
 @app.template_filter('markdown')
 def render_markdown(text):
     if not text:
         return ""
     
-    # 1. Convert markdown to HTML
-    html = markdown.markdown(text, extensions=['extra', 'codehilite', 'toc'])
-    
-    # 2. SECURITY: Sanitize the resulting HTML using centralized logic
-    from utils.security import sanitize_html
-    return sanitize_html(html)
+    from utils.markup import memoized
+    return memoized('markdown', text, _markdown_to_safe_html)
 
 @app.template_filter('sanitize')
 def sanitize_filter(html):
+    from utils.markup import memoized
     from utils.security import sanitize_html
-    return sanitize_html(html)
+    return memoized('sanitize', html, sanitize_html)
 
 # Global variables
 supabase = None
@@ -115,8 +122,10 @@ def init_argon2():
     global ph
     try:
         from argon2 import PasswordHasher
-        ph = PasswordHasher()
-        print("STARTUP: Argon2 password hasher initialized")
+        from utils.kdf import argon2_params
+        params = argon2_params()
+        ph = PasswordHasher(**params)
+        print(f"STARTUP: Argon2 password hasher initialized {params}")
     except ImportError:
         print("WARNING: Argon2 not available - using fallback")
 
@@ -134,10 +143,22 @@ app.register_blueprint(curation_bp)
 app.register_blueprint(submissions_bp)
 app.register_blueprint(proposals_bp)
 app.register_blueprint(issues_bp)
+app.register_blueprint(search_bp)
 
 # Import utilities
-from utils.auth import verify_api_key, is_core_team, get_api_key_header, safe_error
-from utils.content import get_all_issues, get_issue, get_all_special_issues, get_special_issue
+from utils.auth import verify_api_key, is_core_team, get_api_key_header, safe_error, admin_required
+from utils.kdf import KDFBusyError
+
+@app.errorhandler(KDFBusyError)
+def kdf_busy(e):
+    """Too many concurrent key derivations - shed load instead of queueing without bound"""
+    response = jsonify({'error': 'Server is busy verifying credentials. Retry shortly.'})
+    response.headers['Retry-After'] = '1'
+    return response, 503
+from utils.content import (
+    list_issues, get_issue, get_all_special_issues, get_special_issue,
+    BLOG_DIR, load_blog_post, get_blog_post
+)
 from utils.stats import get_stats_data
 
 # Core application routes
@@ -145,7 +166,7 @@ from utils.stats import get_stats_data
 def index():
     """Main landing page"""
     try:
-        issues = get_all_issues()
+        issues = list_issues()
         special_issues = get_all_special_issues()
         return render_template('index.html', issues=issues, special_issues=special_issues)
     except Exception as e:
@@ -162,6 +183,33 @@ def special_issue_page(slug):
     except Exception as e:
         return safe_error(e)
 
+def _json_with_etag(payload, version=None):
+    """
+    JSON response with an ETag, or an empty 304 if the client already has it.
+    
+    Args:
+        payload: JSON-serializable data to send
+        version: Cache version of the payload (skips hashing the body when known).
+                 Read it before the data so a concurrent refresh can only make the
+                 ETag older than the body, never newer. The payload must then be
+                 fixed for that version - no per-request fields such as ages.
+    """
+    import hashlib
+    from flask import make_response
+    
+    # One canonical form, so the same payload always yields the same bytes
+    body = json.dumps(payload, separators=(',', ':'), sort_keys=True, default=str)
+    etag = hashlib.sha1((version or body).encode('utf-8')).hexdigest()
+    
+    if request.if_none_match.contains_weak(etag):
+        response = make_response('', 304)
+    else:
+        response = make_response(body)
+        response.mimetype = 'application/json'
+    response.set_etag(etag, weak=True)
+    response.headers['Cache-Control'] = 'no-cache'  # Always revalidate - 304s are cheap
+    return response
+
 @app.route('/stats')
 def stats_page():
     """Stats page - renders immediately with skeleton, data loaded via API"""
@@ -173,7 +221,9 @@ def api_stats_fast():
     # Rate limiting handled by frontend caching - no explicit limit needed
     try:
         from utils.stats import get_fast_stats
-        return jsonify(get_fast_stats())
+        from utils.cache import get_cache_version
+        version = get_cache_version('fast_stats')
+        return _json_with_etag(get_fast_stats(), version)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -182,8 +232,10 @@ def api_stats_github():
     """GitHub stats - tries database first for instant loading"""
     try:
         from utils.stats import get_github_stats
+        from utils.cache import get_cache_version
         force_refresh = request.args.get('force_refresh', 'false').lower() == 'true'
-        return jsonify(get_github_stats(force_refresh=force_refresh))
+        version = None if force_refresh else get_cache_version('github_stats')
+        return _json_with_etag(get_github_stats(force_refresh=force_refresh), version)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -212,102 +264,121 @@ def admin_sync_signals():
 def api_stats():
     """API endpoint for all stats data - called asynchronously by frontend"""
     try:
+        from utils.cache import get_cache_version
         force_refresh = request.args.get('force_refresh', 'false').lower() == 'true'
         if force_refresh:
             from utils.cache import invalidate_cache
             invalidate_cache('stats_data')
             
+        version = get_cache_version('stats_data')
         stats_data = get_stats_data()
-        return jsonify(stats_data)
+        return _json_with_etag(stats_data, version)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
 @app.route('/api/admin/refresh-all', methods=['POST'])
+@admin_required
 def admin_refresh_all():
     """Sync everything and clear all stats caches - requires dual-key auth"""
-    from flask import session
     from services.github import sync_signals_to_db
-    from utils.cache import invalidate_cache
-    from utils.auth import verify_api_key, verify_master_key, is_core_team
-    
-    # Check session auth OR dual-key auth
-    if not session.get('admin_auth'):
-        api_key = request.headers.get('X-API-KEY')
-        master_key = request.headers.get('X-MASTER-KEY')
-        
-        if not api_key or not master_key:
-            return jsonify({'error': 'Dual-key authentication required (X-API-KEY and X-MASTER-KEY)'}), 401
-        
-        if not verify_master_key(master_key):
-            return jsonify({'error': 'Invalid Master Key'}), 401
-        
-        agent_name = verify_api_key(api_key)
-        if not agent_name or not is_core_team(agent_name):
-            return jsonify({'error': 'Core team authorization required'}), 403
+    from utils.cache import invalidate_tag
+    from utils.warmup import warm_caches
     
     try:
         # 1. Sync GitHub signals to DB
         count = sync_signals_to_db()
         
         # 2. Invalidate all stats-related caches
-        keys_to_clear = ['github_stats', 'stats_data', 'signals_cache']
-        cleared = []
-        for key in keys_to_clear:
-            if invalidate_cache(key):
-                cleared.append(key)
+        cleared = invalidate_tag('signals')
+        
+        # 3. Rebuild them now so the next visitor gets a warm cache
+        warmed = warm_caches()
                 
         return jsonify({
             'success': True, 
             'synced': count,
             'cleared_caches': cleared,
-            'message': 'Full system refresh completed. Stats will reflect latest data on next load.'
+            'warmed': warmed,
+            'message': 'Full system refresh completed. Stats caches have been rebuilt.'
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
 @app.route('/api/admin/cache/clear', methods=['POST'])
+@admin_required
 def admin_clear_cache():
     """Clear cache entries - requires dual-key authentication"""
-    from flask import session
-    from utils.cache import invalidate_cache
-    from utils.auth import verify_api_key, verify_master_key, is_core_team
-    
-    # Check session auth OR dual-key auth
-    if not session.get('admin_auth'):
-        api_key = request.headers.get('X-API-KEY')
-        master_key = request.headers.get('X-MASTER-KEY')
-        
-        if not api_key or not master_key:
-            return jsonify({'error': 'Dual-key authentication required (X-API-KEY and X-MASTER-KEY)'}), 401
-        
-        if not verify_master_key(master_key):
-            return jsonify({'error': 'Invalid Master Key'}), 401
-        
-        agent_name = verify_api_key(api_key)
-        if not agent_name or not is_core_team(agent_name):
-            return jsonify({'error': 'Core team authorization required'}), 403
+    from utils.cache import invalidate_cache, invalidate_tag, CACHE_TAGS
     
-    # Get cache key to clear (optional - clear all if not specified)
+    # Get cache key or tag to clear (optional - clear all if not specified)
     cache_key = request.json.get('key_name') if request.is_json else None
+    tag = request.json.get('tag') if request.is_json else None
     
     if cache_key:
         # Clear specific cache key
         success = invalidate_cache(cache_key)
         return jsonify({'success': success, 'key': cache_key})
+    elif tag:
+        # Clear a group of keys in one round trip
+        if tag not in CACHE_TAGS:
+            return jsonify({'error': f'Unknown tag. Choose from: {", ".join(sorted(CACHE_TAGS))}'}), 400
+        cleared = invalidate_tag(tag)
+        return jsonify({'success': bool(cleared), 'tag': tag, 'cleared': cleared})
     else:
         # Clear all known cache keys
-        keys_to_clear = ['github_stats', 'fast_stats', 'stats_data', 'pr_metadata', 'signals_cache']
-        cleared = []
-        for key in keys_to_clear:
-            if invalidate_cache(key):
-                cleared.append(key)
+        cleared = invalidate_tag('all')
         return jsonify({'success': True, 'cleared': cleared})
 
-# Blog routes
-BLOG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'blog')
+@app.route('/api/admin/cache/metrics', methods=['GET'])
+@admin_required
+def admin_cache_metrics():
+    """Per-key cache hit/miss/stale counters and compute latency - requires dual-key auth"""
+    from utils import cache_metrics
+    from utils.cache import INSTANCE_ID
+    
+    # Metrics are per instance - include the id so samples from different instances can be told apart
+    metrics = cache_metrics.snapshot()
+    metrics['instance'] = INSTANCE_ID
+    return jsonify(metrics)
+
+@app.route('/api/admin/cache/warm', methods=['POST'])
+@admin_required
+def admin_warm_cache():
+    """Precompute stats, GitHub stats and mesh caches - requires dual-key auth"""
+    from utils.warmup import warm_caches, WARM_KEYS
+    
+    data = request.get_json(silent=True) or {}
+    keys = data.get('keys')
+    if keys is not None:
+        if not isinstance(keys, list) or any(k not in WARM_KEYS for k in keys):
+            return jsonify({'error': f"keys must be a list drawn from: {', '.join(WARM_KEYS)}"}), 400
+    
+    results = warm_caches(keys)
+    return jsonify({'success': all(r['ok'] for r in results.values()), 'warmed': results})
+
+@app.route('/api/admin/janitor', methods=['POST'])
+@admin_required
+def admin_janitor():
+    """Delete expired cache_entries and rate_limits rows in bounded batches - requires dual-key auth"""
+    from utils.janitor import run_janitor, JANITOR_BATCH_SIZE, JANITOR_MAX_BATCHES
+    
+    data = request.get_json(silent=True) or {}
+    try:
+        batch_size = min(max(int(data.get('batch_size', JANITOR_BATCH_SIZE)), 1), 1000)
+        max_batches = min(max(int(data.get('max_batches', JANITOR_MAX_BATCHES)), 1), 100)
+    except (TypeError, ValueError):
+        return jsonify({'error': 'batch_size and max_batches must be integers'}), 400
+    
+    report = run_janitor(batch_size, max_batches)
+    return jsonify({
+        'success': not any(r.get('error') for r in report.values()),
+        'removed': sum(r['removed'] for r in report.values()),
+        'tables': report
+    })
 
+# Blog routes
 def get_blog_posts():
     """Load all blog posts from JSON files"""
     posts = []
@@ -316,9 +387,7 @@ def get_blog_posts():
             if filename.endswith('.json'):
                 filepath = os.path.join(BLOG_DIR, filename)
                 try:
-                    with open(filepath, 'r') as f:
-                        post = json.load(f)
-                        posts.append(post)
+                    posts.append(load_blog_post(filepath))
                 except Exception as e:
                     print(f"Error loading blog post {filename}: {e}")
     # Sort by date descending
@@ -338,8 +407,7 @@ def blog_page():
 def blog_post_page(slug):
     """Single blog post page"""
     try:
-        posts = get_blog_posts()
-        post = next((p for p in posts if p.get('slug') == slug), None)
+        post = get_blog_post(slug)
         if not post:
             return "Blog post not found", 404
         return render_template('blog_post.html', post=post)
@@ -354,10 +422,7 @@ def issue_page(filename):
         if not post:
             return "Issue not found", 404
             
-        # Ensure it's sanitized (get_issue already does it, but we can be explicit here)
-        from utils.security import sanitize_html
-        html_content = sanitize_html(html_content)
-        
+        # html_content is sanitized by get_issue (and cached already sanitized)
         return render_template('issue.html', post=post, content=html_content)
     except Exception as e:
         from werkzeug.exceptions import HTTPException
@@ -762,122 +827,12 @@ def fudge_gallery():
 def mesh_graph():
     """Core team agent mesh visualization"""
     try:
-        from app import supabase
-        if supabase:
-            # Core team roles
-            core_roles = {'editor', 'curator', 'coordinator', 'contributor', 'publisher'}
-            
-            # Get all agents with their roles and projects
-            agents_response = supabase.table('agents').select('*').execute()
-            all_agents = agents_response.data or []
-            
-            # Filter to core team only
-            core_agents = []
-            for agent in all_agents:
-                roles = agent.get('roles', [])
-                agent_name = agent.get('name', '')
-                # Include if has core role
-                is_core = False
-                if roles:
-                    for role in roles:
-                        if role.lower() in core_roles:
-                            is_core = True
-                            break
-                    
-                if is_core:
-                    core_agents.append({
-                        'name': agent_name,
-                        'faction': agent.get('faction', 'Wanderer'),
-                        'xp': float(agent.get('xp', 0)),
-                        'title': agent.get('title', 'Unascended'),
-                        'bio': agent.get('bio', ''),
-                        'roles': roles if roles else ['core'],
-                        'projects': agent.get('projects', []),
-                        'projects_link': agent.get('projects_link')
-                    })
-            
-            # Sort agents so those with projects are on top
-            core_agents.sort(key=lambda x: len(x.get('projects') or []), reverse=True)
-            
-            # Get curation votes to build connections (agents who voted on same PRs)
-            votes_response = supabase.table('curation_votes').select('pr_number, agent_name').execute()
-            votes = votes_response.data or []
-            
-            # Get proposal votes for additional connections
-            prop_votes_response = supabase.table('proposal_votes').select('proposal_id, agent_name').execute()
-            prop_votes = prop_votes_response.data or []
-            
-            # Get proposal comments for more connections
-            comments_response = supabase.table('proposal_comments').select('proposal_id, agent_name').execute()
-            comments = comments_response.data or []
-            
-            # Build edges (connections between core team agents)
-            edge_map = {}
-            core_names = {a['name'] for a in core_agents}
-            
-            # Process curation votes
-            pr_voters = {}
-            for vote in votes:
-                pr_num = vote['pr_number']
-                agent = vote['agent_name']
-                if agent in core_names:
-                    if pr_num not in pr_voters:
-                        pr_voters[pr_num] = []
-                    pr_voters[pr_num].append(agent)
-            
-            for pr_num, voters in pr_voters.items():
-                for i, a1 in enumerate(voters):
-                    for a2 in voters[i+1:]:
-                        key = tuple(sorted([a1, a2]))
-                        edge_map[key] = edge_map.get(key, 0.0) + 1.0
-            
-            # Process proposal votes
-            prop_voters = {}
-            for vote in prop_votes:
-                prop_id = vote['proposal_id']
-                agent = vote['agent_name']
-                if agent in core_names:
-                    if prop_id not in prop_voters:
-                        prop_voters[prop_id] = []
-                    prop_voters[prop_id].append(agent)
-            
-            for prop_id, voters in prop_voters.items():
-                for i, a1 in enumerate(voters):
-                    for a2 in voters[i+1:]:
-                        key = tuple(sorted([a1, a2]))
-                        edge_map[key] = edge_map.get(key, 0.0) + 1.0
-            
-            # Process proposal comments
-            prop_commenters = {}
-            for comment in comments:
-                prop_id = comment['proposal_id']
-                agent = comment['agent_name']
-                if agent in core_names:
-                    if prop_id not in prop_commenters:
-                        prop_commenters[prop_id] = []
-                    prop_commenters[prop_id].append(agent)
-            
-            for prop_id, commenters in prop_commenters.items():
-                for i, a1 in enumerate(commenters):
-                    for a2 in commenters[i+1:]:
-                        key = tuple(sorted([a1, a2]))
-                        edge_map[key] = edge_map.get(key, 0.0) + 0.5
-            
-            # Convert edges to list
-            edges = []
-            for (source, target), weight in edge_map.items():
-                edges.append({
-                    'source': source,
-                    'target': target,
-                    'weight': weight
-                })
-            
-            return render_template('mesh.html', agents=core_agents, edges=edges)
+        from utils.stats import get_mesh_graph
+        graph = get_mesh_graph()
+        return render_template('mesh.html', agents=graph['agents'], edges=graph['edges'])
     except Exception as e:
         print(f"Mesh graph error: {e}", flush=True)
         return render_template('mesh.html', agents=[], edges=[])
-    
-    return render_template('mesh.html', agents=[], edges=[])
 
 @app.route('/create_fudge/', methods=['GET', 'POST'])
 def create_fudge_endpoint():
@@ -977,7 +932,7 @@ def api_stats_transmissions():
         except Exception as e:
             print(f"Non-fatal error enriching factions: {e}")
 
-        return jsonify(formatted_signals)
+        return _json_with_etag(formatted_signals)
     except Exception as e:
         print(f"Error in api_stats_transmissions: {e}")
         return jsonify({'error': str(e)}), 500
@@ -135,6 +135,50 @@ CREATE TABLE IF NOT EXISTS cache_entries (
 -- Index for efficient expiration cleanup
 CREATE INDEX IF NOT EXISTS idx_cache_expires ON cache_entries(expires_at);
 
+-- Seconds the cached value took to compute (drives XFetch early refresh).
+-- Compute leases are stored as short-lived 'lease:<key>' rows in the same table.
+ALTER TABLE cache_entries ADD COLUMN IF NOT EXISTS compute_seconds REAL;
+
+-- Payload sizes in bytes. Values above the compression threshold are stored
+-- as {"_zlib_b64": "..."} envelopes, so stored_size < raw_size for those rows.
+ALTER TABLE cache_entries ADD COLUMN IF NOT EXISTS raw_size INTEGER;
+ALTER TABLE cache_entries ADD COLUMN IF NOT EXISTS stored_size INTEGER;
+
+-- === Rate Limit Counters ===
+-- One row per "<ip>:<endpoint>" for the current fixed window (utils/rate_limit.py)
+CREATE TABLE IF NOT EXISTS rate_limits (
+  key TEXT PRIMARY KEY,
+  hits INTEGER NOT NULL DEFAULT 0,
+  reset_time TIMESTAMPTZ NOT NULL
+);
+
+-- Index for efficient expiration cleanup
+CREATE INDEX IF NOT EXISTS idx_rate_limits_reset ON rate_limits(reset_time);
+
+ALTER TABLE rate_limits ENABLE ROW LEVEL SECURITY;
+
+-- Atomically add p_hits[i] to the window ending at p_reset_times[i] for each
+-- p_keys[i] and return the window totals, in one statement (one round trip per
+-- sync). A newer window replaces the stored one; hits for an older window than
+-- the stored one are dropped. Keys must be unique within a call.
+DROP FUNCTION IF EXISTS rate_limit_hit(TEXT, INTEGER, TIMESTAMPTZ);
+
+CREATE OR REPLACE FUNCTION rate_limit_hit(p_keys TEXT[], p_hits INTEGER[], p_reset_times TIMESTAMPTZ[])
+RETURNS TABLE (key TEXT, hits INTEGER)
+LANGUAGE sql
+AS $$
+  INSERT INTO rate_limits AS r (key, hits, reset_time)
+  SELECT u.k, u.h, u.t FROM unnest(p_keys, p_hits, p_reset_times) AS u(k, h, t)
+  ON CONFLICT (key) DO UPDATE SET
+    hits = CASE
+      WHEN r.reset_time = EXCLUDED.reset_time THEN r.hits + EXCLUDED.hits
+      WHEN r.reset_time < EXCLUDED.reset_time THEN EXCLUDED.hits
+      ELSE r.hits
+    END,
+    reset_time = GREATEST(r.reset_time, EXCLUDED.reset_time)
+  RETURNING r.key, r.hits;
+$$;
+
 -- === GitHub Signals Cache Table ===
 -- Syncs PR data from GitHub for instant stats queries
 CREATE TABLE IF NOT EXISTS github_signals (
@@ -180,3 +224,10 @@ CREATE INDEX IF NOT EXISTS idx_xp_transactions_created_at ON xp_transactions(cre
 -- RLS for XP transactions
 ALTER TABLE xp_transactions ENABLE ROW LEVEL SECURITY;
 CREATE POLICY "Public Read XP Transactions" ON xp_transactions FOR SELECT USING (true);
+
+-- === API Key Identifiers ===
+-- Keys issued by /api/join look like ts_<key_id>_<secret>; key_id is public and
+-- lets verify_api_key find the agent with one indexed lookup. Legacy keys have
+-- no key_id until the agent calls POST /api/agent/rotate-key.
+ALTER TABLE agents ADD COLUMN IF NOT EXISTS key_id TEXT;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_agents_key_id ON agents(key_id);
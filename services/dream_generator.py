@@ -2,7 +2,7 @@ import os
 import sys
 import requests
 from datetime import datetime
-from utils.content import get_all_issues
+from utils.content import list_issues
 from skills.leonardo.leonardo import generate_image
 from services.github import get_repo
 
@@ -20,7 +20,7 @@ def generate_weekly_dream(dry_run=False):
         # ... (rest of the fetching and LLM logic remains the same)
         # (I will use a large replacement chunk to ensure dry_run is properly integrated)
         # 1. Fetch Articles
-        issues = get_all_issues()
+        issues = list_issues()
         if not issues:
             return {"success": False, "error": "No zine issues found."}
             
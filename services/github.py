@@ -45,88 +45,59 @@ def _get_supabase():
         print(f"CACHE: Could not get supabase client: {e}", flush=True)
         return None
 
+PR_METADATA_TTL = 30 * 24 * 3600  # 30 days - keyed by head sha, so entries never go stale
+SIGNALS_CACHE_TTL = 3600  # 1 hour
+
 def _load_pr_cache():
-    """Load PR metadata cache from Supabase (non-blocking, graceful fallback)."""
+    """Load PR metadata cache from the shared cache (non-blocking, graceful fallback)."""
     global _pr_metadata_cache
     
     # Always initialize to empty dict if not set
     if _pr_metadata_cache is None:
         _pr_metadata_cache = {}
     
-    # Try to load from Supabase, but don't block on failure
+    # Try to load from the cache layer, but don't block on failure
     try:
-        supabase = _get_supabase()
-        if supabase:
-            result = supabase.table('cache_entries').select('data').eq('key', 'pr_metadata').execute()
-            if result.data and len(result.data) > 0:
-                loaded_data = result.data[0].get('data', {})
-                if isinstance(loaded_data, dict):
-                    _pr_metadata_cache.update(loaded_data)
-                    print(f"CACHE: Loaded {len(loaded_data)} PR metadata entries from Supabase", flush=True)
+        from utils.cache import get_cache
+        loaded_data = get_cache('pr_metadata', PR_METADATA_TTL)
+        if isinstance(loaded_data, dict) and loaded_data is not _pr_metadata_cache:
+            _pr_metadata_cache.update(loaded_data)
+            print(f"CACHE: Loaded {len(loaded_data)} PR metadata entries from cache", flush=True)
     except Exception as e:
-        print(f"CACHE: Could not load PR metadata from Supabase (using empty cache): {e}", flush=True)
+        print(f"CACHE: Could not load PR metadata from cache (using empty cache): {e}", flush=True)
 
 def _save_pr_cache():
-    """Save PR metadata cache to Supabase (non-blocking)."""
+    """Save PR metadata cache through the shared cache (compressed when large)."""
     global _pr_metadata_cache
     if not _pr_metadata_cache:
         return
     
     try:
-        supabase = _get_supabase()
-        if supabase:
-            from datetime import datetime, timezone, timedelta
-            expires_at = (datetime.now(timezone.utc) + timedelta(days=30)).isoformat()
-            supabase.table('cache_entries').upsert({
-                'key': 'pr_metadata',
-                'data': _pr_metadata_cache,
-                'expires_at': expires_at
-            }, on_conflict='key').execute()
+        from utils.cache import set_cache
+        if set_cache('pr_metadata', dict(_pr_metadata_cache), PR_METADATA_TTL):
             print(f"CACHE: Saved {len(_pr_metadata_cache)} PR metadata entries to Supabase", flush=True)
     except Exception as e:
         print(f"CACHE: Could not save PR metadata to Supabase: {e}", flush=True)
 
 def _load_signals_cache():
-    """Load signals cache from Supabase (non-blocking, graceful fallback)."""
+    """Load signals cache from the shared cache (non-blocking, graceful fallback)."""
     try:
-        supabase = _get_supabase()
-        if supabase:
-            result = supabase.table('cache_entries').select('data, expires_at').eq('key', 'signals_cache').execute()
-            if result.data and len(result.data) > 0:
-                entry = result.data[0]
-                expires_at = entry.get('expires_at')
-                
-                # Check if expired
-                if expires_at:
-                    from datetime import datetime, timezone
-                    try:
-                        expires_dt = datetime.fromisoformat(expires_at.replace('Z', '+00:00'))
-                        if datetime.now(timezone.utc) > expires_dt:
-                            print(f"CACHE: signals_cache expired", flush=True)
-                            return {}
-                    except:
-                        pass
-                
-                print(f"CACHE: Loaded signals cache from Supabase", flush=True)
-                return entry.get('data', {})
+        from utils.cache import get_cache
+        data = get_cache('signals_cache', SIGNALS_CACHE_TTL)
+        if data is not None:
+            print(f"CACHE: Loaded signals cache", flush=True)
+            return data
     except Exception as e:
-        print(f"CACHE: Could not load signals cache from Supabase: {e}", flush=True)
+        print(f"CACHE: Could not load signals cache: {e}", flush=True)
     return {}
 
 def _save_signals_cache(signals):
-    """Save signals cache to Supabase (non-blocking)."""
+    """Save signals cache through the shared cache (compressed when large)."""
     if not signals:
         return
     try:
-        supabase = _get_supabase()
-        if supabase:
-            from datetime import datetime, timezone, timedelta
-            expires_at = (datetime.now(timezone.utc) + timedelta(hours=1)).isoformat()
-            supabase.table('cache_entries').upsert({
-                'key': 'signals_cache',
-                'data': signals,
-                'expires_at': expires_at
-            }, on_conflict='key').execute()
+        from utils.cache import set_cache
+        if set_cache('signals_cache', signals, SIGNALS_CACHE_TTL):
             print(f"CACHE: Saved signals cache to Supabase", flush=True)
     except Exception as e:
         print(f"CACHE: Could not save signals cache to Supabase: {e}", flush=True)
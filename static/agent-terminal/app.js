@@ -4,6 +4,8 @@ const API_BASE = "/api";
 const state = {
     agentName: localStorage.getItem('agentName') || "",
     apiKey: sessionStorage.getItem('apiKey') || "",
+    sessionToken: sessionStorage.getItem('sessionToken') || "",
+    sessionExpires: Number(sessionStorage.getItem('sessionExpires') || 0),
     profile: null,
     queue: [],
     proposals: [],
@@ -133,6 +135,8 @@ el.loginBtn.addEventListener('click', async () => {
 
     state.agentName = name;
     state.apiKey = key;
+    state.sessionToken = "";
+    state.sessionExpires = 0;
 
     const success = await loadProfile();
     if (success) {
@@ -152,15 +156,43 @@ el.loginBtn.addEventListener('click', async () => {
 el.logoutBtn.addEventListener('click', () => {
     localStorage.removeItem('agentName');
     sessionStorage.removeItem('apiKey');
+    sessionStorage.removeItem('sessionToken');
+    sessionStorage.removeItem('sessionExpires');
     location.reload();
 });
 
+// Exchange the API key for a short-lived session token, refreshed a minute before it expires.
+// Falls back to the raw key if the token endpoint is unavailable.
+async function getAuthToken() {
+    const now = Date.now() / 1000;
+    if (state.sessionToken && state.sessionExpires - now > 60) {
+        return state.sessionToken;
+    }
+    try {
+        const res = await fetch(`${API_BASE}/auth/token`, {
+            method: 'POST',
+            headers: { 'X-API-KEY': state.apiKey, 'X-AGENT-NAME': state.agentName }
+        });
+        if (!res.ok) return state.apiKey;
+
+        const data = await res.json();
+        state.sessionToken = data.token;
+        state.sessionExpires = data.expires_at;
+        sessionStorage.setItem('sessionToken', data.token);
+        sessionStorage.setItem('sessionExpires', String(data.expires_at));
+        return data.token;
+    } catch (err) {
+        console.error("Session token error:", err);
+        return state.apiKey;
+    }
+}
+
 // Data Fetching
 async function loadProfile() {
     try {
         const headers = {};
         if (state.apiKey) {
-            headers['X-API-KEY'] = state.apiKey;
+            headers['X-API-KEY'] = await getAuthToken();
         }
         const res = await fetch(`${API_BASE}/agent/${state.agentName}`, { headers });
         if (!res.ok) return false;
@@ -453,7 +485,7 @@ async function castProposalAction(type, voteValue) {
     try {
         const res = await fetch(`${API_BASE}/proposals/${endpoint}`, {
             method: 'POST',
-            headers: { 'Content-Type': 'application/json', 'X-API-KEY': state.apiKey },
+            headers: { 'Content-Type': 'application/json', 'X-API-KEY': await getAuthToken() },
             body: JSON.stringify(body)
         });
 
@@ -512,7 +544,7 @@ el.submitBtn.addEventListener('click', async () => {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json',
-                'X-API-KEY': state.apiKey
+                'X-API-KEY': await getAuthToken()
             },
             body: JSON.stringify({
                 author: state.agentName,
@@ -587,7 +619,7 @@ async function castVote(voteType) {
         method: 'POST',
         headers: {
             'Content-Type': 'application/json',
-            'X-API-KEY': state.apiKey
+            'X-API-KEY': await getAuthToken()
         },
         body: JSON.stringify({
             agent: state.agentName,
@@ -619,7 +651,7 @@ async function adminProposalAction(action) {
     try {
         const res = await fetch(`${API_BASE}/proposals/${endpoint}`, {
             method: 'POST',
-            headers: { 'Content-Type': 'application/json', 'X-API-KEY': state.apiKey },
+            headers: { 'Content-Type': 'application/json', 'X-API-KEY': await getAuthToken() },
             body: JSON.stringify({ proposal_id: state.selectedProposal.id })
         });
         if (res.ok) {
@@ -661,7 +693,7 @@ el.submitPropBtn.addEventListener('click', async () => {
     try {
         const res = await fetch(`${API_BASE}/proposals`, {
             method: 'POST',
-            headers: { 'Content-Type': 'application/json', 'X-API-KEY': state.apiKey },
+            headers: { 'Content-Type': 'application/json', 'X-API-KEY': await getAuthToken() },
             body: JSON.stringify({
                 title: title,
                 proposal_type: type,
@@ -693,7 +725,7 @@ el.cleanupProposalsBtn.addEventListener('click', async () => {
     try {
         const res = await fetch(`${API_BASE}/proposals/check-expired`, {
             method: 'POST',
-            headers: { 'X-API-KEY': state.apiKey }
+            headers: { 'X-API-KEY': await getAuthToken() }
         });
         const data = await res.json();
         alert(data.message || "System maintenance complete.");
@@ -60,13 +60,19 @@ def award_xp_to_agent(target_agent: str, amount: float, source: str = 'manual',
         if not supabase:
             return False, "Database not configured"
             
-        # Get current XP and faction
-        result = supabase.table('agents').select('xp, faction').eq('name', target_agent).execute()
-        if not result.data:
-            return False, "Agent not found"
-            
-        current_xp = float(result.data[0].get('xp', 0))
-        faction = result.data[0].get('faction', 'Wanderer')
+        # Get current XP and faction - already loaded if the target is this request's agent
+        from utils.auth import get_principal
+        principal = get_principal(target_agent)
+        if principal is not None and principal['xp'] is not None:
+            current_xp = principal['xp']
+            faction = principal['faction']
+        else:
+            result = supabase.table('agents').select('xp, faction').eq('name', target_agent).execute()
+            if not result.data:
+                return False, "Agent not found"
+                
+            current_xp = float(result.data[0].get('xp', 0))
+            faction = result.data[0].get('faction', 'Wanderer')
         new_xp = current_xp + amount
         
         new_level, new_title, _, _ = calculate_agent_level_and_title(new_xp, faction)
@@ -78,6 +84,9 @@ def award_xp_to_agent(target_agent: str, amount: float, source: str = 'manual',
             'title': new_title
         }).eq('name', target_agent).execute()
         
+        if principal is not None and principal['xp'] is not None:
+            principal['xp'] = new_xp
+        
         # Log the XP transaction for auditability
         try:
             supabase.table('xp_transactions').insert({
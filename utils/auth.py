@@ -1,7 +1,15 @@
+import base64
+import hashlib
 import hmac
+import json
 import os
 import re
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
 from werkzeug.security import check_password_hash
+from utils.kdf import KDFBusyError, run_kdf, submit_kdf
 
 # Reserved agent names that cannot be used for NEW agents
 RESERVED_NAMES = {'admin', 'system', 'moderator', 'root', 'api', 'null', 'undefined'}
@@ -9,6 +17,33 @@ RESERVED_NAMES = {'admin', 'system', 'moderator', 'root', 'api', 'null', 'undefi
 # Valid agent name pattern: 2-50 chars, alphanumeric, underscores, hyphens
 AGENT_NAME_PATTERN = re.compile(r'^[a-zA-Z0-9_-]{2,50}$')
 
+# API keys issued by /api/join carry a public identifier: ts_<key_id>_<secret>.
+# key_id is stored (indexed) on the agent row, so any key resolves with one
+# lookup and one hash check. Older bare-hex keys keep working until rotated.
+API_KEY_PREFIX = 'ts'
+API_KEY_PATTERN = re.compile(r'^ts_([0-9a-f]{16})_[0-9a-f]{64}$')
+
+# Short-lived signed session tokens: st.<payload>.<signature>, where payload is
+# base64url JSON {sub, roles, exp} and signature is HMAC-SHA256 over "st.<payload>".
+# Validated without touching the database - see issue_session_token.
+SESSION_TOKEN_PREFIX = 'st'
+SESSION_TOKEN_TTL = 900  # 15 minutes
+
+# Columns loaded once per request for the authenticated agent (see get_principal)
+PRINCIPAL_FIELDS = 'name, api_key, roles, faction, xp'
+
+# Verified-credential cache: skips the KDF for keys verified recently.
+# Entries are keyed by an HMAC of the presented key (raw keys are never kept)
+# and pinned to the stored hash they were verified against, so a rotated key
+# stops matching as soon as the new hash is read.
+CREDENTIAL_CACHE_TTL = 300  # Seconds a successful verification is reused
+CREDENTIAL_CACHE_MAX_ENTRIES = 1024
+_CREDENTIAL_SECRET = os.urandom(32)  # Per process - cache ids are useless outside it
+MASTER_PRINCIPAL = 'system'  # Reserved name the master key's cache entries are filed under
+
+_credential_cache = OrderedDict()
+_credential_lock = threading.Lock()
+
 def validate_agent_name(name):
     """Validate agent name for security.
     
@@ -61,6 +96,85 @@ def sanitize_agent_name(name):
     
     return name.title()
 
+def generate_api_key():
+    """Create a new API key with a public identifier prefix.
+    
+    Returns:
+        Tuple of (raw_api_key, key_id)
+    """
+    import secrets
+    key_id = secrets.token_hex(8)
+    return f"{API_KEY_PREFIX}_{key_id}_{secrets.token_hex(32)}", key_id
+
+def hash_api_key(raw_api_key):
+    """Hash an API key for storage (Argon2, Werkzeug PBKDF2 if Argon2 is missing)"""
+    from app import ph
+    if ph:
+        return run_kdf(ph.hash, raw_api_key)
+    # Fallback to Werkzeug if Argon2 is missing for some reason
+    from werkzeug.security import generate_password_hash
+    return generate_password_hash(raw_api_key, method='pbkdf2:sha256')
+
+def parse_key_id(api_key):
+    """Return the public key_id of a prefixed API key, or None for legacy keys"""
+    match = API_KEY_PATTERN.match(api_key or '')
+    return match.group(1) if match else None
+
+def _session_secret():
+    """Signing key for session tokens (SESSION_TOKEN_SECRET, else the Flask secret key)"""
+    secret = os.environ.get('SESSION_TOKEN_SECRET')
+    if not secret:
+        from app import app
+        secret = app.secret_key
+    return secret.encode('utf-8') if isinstance(secret, str) else secret
+
+def _b64encode(raw):
+    return base64.urlsafe_b64encode(raw).rstrip(b'=').decode('ascii')
+
+def _b64decode(text):
+    return base64.urlsafe_b64decode(text + '=' * (-len(text) % 4))
+
+def _sign(message):
+    return _b64encode(hmac.new(_session_secret(), message.encode('ascii'), hashlib.sha256).digest())
+
+def is_session_token(value):
+    """Check whether a presented credential is a session token rather than an API key"""
+    return bool(value) and value.startswith(SESSION_TOKEN_PREFIX + '.')
+
+def issue_session_token(agent_name, roles):
+    """Create a signed session token for an agent.
+    
+    Args:
+        agent_name: The authenticated agent
+        roles: The agent's roles at issue time
+        
+    Returns:
+        Tuple of (token, expires_at epoch seconds)
+    """
+    expires_at = int(time.time()) + SESSION_TOKEN_TTL
+    payload = json.dumps({'sub': agent_name, 'roles': list(roles or []), 'exp': expires_at}, separators=(',', ':'))
+    message = f"{SESSION_TOKEN_PREFIX}.{_b64encode(payload.encode('utf-8'))}"
+    return f"{message}.{_sign(message)}", expires_at
+
+def verify_session_token(token):
+    """Validate a session token's signature and expiry - no database access.
+    
+    Returns:
+        Claims dict (sub, roles, exp) or None if invalid or expired
+    """
+    try:
+        prefix, payload, signature = token.split('.')
+        if prefix != SESSION_TOKEN_PREFIX:
+            return None
+        if not hmac.compare_digest(_sign(f"{prefix}.{payload}"), signature):
+            return None
+        claims = json.loads(_b64decode(payload))
+        if claims.get('exp', 0) < time.time():
+            return None
+        return claims
+    except Exception:
+        return None
+
 def verify_master_key(master_key):
     """Verify the system-wide master key against stored hash.
     
@@ -77,64 +191,211 @@ def verify_master_key(master_key):
     if not master_key_hash:
         return False
         
-    return check_password_hash(master_key_hash, master_key)
+    return _verify_agent_hash(MASTER_PRINCIPAL, master_key_hash, master_key)
+
+def _master_legacy_fallback():
+    """Whether a master key sent without X-KEY-TYPE is still accepted (default: yes)"""
+    return os.environ.get('MASTER_KEY_LEGACY_FALLBACK', 'true').strip().lower() not in ('false', '0', 'no')
 
-def verify_api_key(api_key, agent_name=None):
-    """Verify API key and return agent name if valid"""
+def verify_api_key(api_key, agent_name=None, allow_token=False):
+    """Verify API key and return agent name if valid
+    
+    Agent keys cost one indexed lookup and one hash check. The master key is
+    routed explicitly with an `X-KEY-TYPE: master` header, so ordinary agent
+    requests never pay for its derivation.
+    
+    Session tokens are only accepted when allow_token is set - the poll and
+    agent-write endpoints the terminal uses. Admin logins, key rotation and
+    token issuance need the real API key, so a leaked token can't be turned
+    into a longer-lived credential.
+    
+    flask.g.principal is set only when a name is returned; any failure clears it.
+    """
+    _clear_principal()
+    verified = _resolve_api_key(api_key, agent_name, allow_token)
+    if not verified:
+        # Sub-checks may have set the principal before a later check rejected it
+        # (e.g. key_id owner vs X-AGENT-NAME mismatch)
+        _clear_principal()
+    return verified
+
+def _resolve_api_key(api_key, agent_name, allow_token):
+    """verify_api_key without the principal bookkeeping"""
     from app import supabase
     from flask import request
     
     if not api_key or not supabase:
         return None
     
-    # Check master key first - only works for agents with publisher role
-    master_key_hash = os.environ.get('AGENT_API_KEY_HASH')
-    if master_key_hash and check_password_hash(master_key_hash, api_key):
-        # Get allowed IPs from environment (comma-separated)
-        allowed_ips = os.environ.get('MASTER_KEY_ALLOWED_IPS', '').strip()
-        
-        # If IP restrictions are configured, verify the request IP
-        if allowed_ips:
-            # Get client IP (handle Vercel proxy)
-            client_ip = request.headers.get('X-Forwarded-For', request.remote_addr)
-            if client_ip:
-                client_ip = client_ip.split(',')[0].strip()
-            
-            allowed_ip_list = [ip.strip() for ip in allowed_ips.split(',') if ip.strip()]
-            
-            # Check if client IP is in allowed list (or if it's empty, allow all)
-            if allowed_ip_list and client_ip not in allowed_ip_list:
-                print(f"MASTER KEY: Rejected request from unauthorized IP: {client_ip}", flush=True)
-                return None
-        
-        # Master key requires agent name with publisher role
-        if not agent_name:
-            agent_name = request.headers.get('X-AGENT-NAME')
-        
-        if agent_name and has_role(agent_name, 'publisher'):
-            return agent_name
-        
-        return None
-    
     # Try to get agent_name from header if not provided as argument
     if not agent_name:
         agent_name = request.headers.get('X-AGENT-NAME')
     
+    # Session token - signature check only, no KDF or database
+    if is_session_token(api_key):
+        if not allow_token:
+            return None
+        claims = verify_session_token(api_key)
+        if not claims or (agent_name and claims['sub'] != agent_name):
+            return None
+        _set_principal({'name': claims['sub'], 'roles': claims.get('roles')}, via='token')
+        return claims['sub']
+    
+    if request.headers.get('X-KEY-TYPE', '').strip().lower() == 'master':
+        return _verify_master_for_agent(api_key, agent_name)
+    
+    key_id = parse_key_id(api_key)
+    if key_id:
+        # Prefixed key - O(1) lookup by its public identifier (plus 1 hash check)
+        verified = _verify_by_key_id(api_key, key_id)
+        if verified and agent_name and verified != agent_name:
+            verified = None
     # If we have an agent name, do an O(1) lookup (plus 1 hash check)
-    if agent_name:
-        return _verify_specific_agent(api_key, agent_name)
+    elif agent_name:
+        verified = _verify_specific_agent(api_key, agent_name)
+    else:
+        # FALLBACK (O(N)): Search by iterating (Deprecated, transition to X-AGENT-NAME)
+        # This finds the agent in 1 database query but N CPU-intensive hash checks
+        verified = _find_agent_by_key(api_key)
+    
+    if verified:
+        return verified
+    
+    # LEGACY: master key sent as a plain X-API-KEY - only tried once agent auth has failed
+    if agent_name and _master_legacy_fallback():
+        return _verify_master_for_agent(api_key, agent_name)
+    
+    return None
+
+def _verify_master_for_agent(master_key, agent_name):
+    """Master key auth - only works for agents with publisher role"""
+    from app import supabase
+    from flask import request
+    
+    if not verify_master_key(master_key):
+        return None
+    
+    # Get allowed IPs from environment (comma-separated)
+    allowed_ips = os.environ.get('MASTER_KEY_ALLOWED_IPS', '').strip()
+    
+    # If IP restrictions are configured, verify the request IP
+    if allowed_ips:
+        # Get client IP (handle Vercel proxy)
+        client_ip = request.headers.get('X-Forwarded-For', request.remote_addr)
+        if client_ip:
+            client_ip = client_ip.split(',')[0].strip()
+        
+        allowed_ip_list = [ip.strip() for ip in allowed_ips.split(',') if ip.strip()]
+        
+        # Check if client IP is in allowed list (or if it's empty, allow all)
+        if allowed_ip_list and client_ip not in allowed_ip_list:
+            print(f"MASTER KEY: Rejected request from unauthorized IP: {client_ip}", flush=True)
+            return None
+    
+    # Master key requires agent name with publisher role
+    if not agent_name or not validate_agent_name(agent_name)[0]:
+        return None
+    
+    result = supabase.table('agents').select(PRINCIPAL_FIELDS).eq('name', agent_name).execute()
+    if result.data and 'publisher' in [r.lower() for r in (result.data[0].get('roles') or [])]:
+        _set_principal(result.data[0], via='master')
+        return agent_name
+    
+    return None
+
+def _credential_id(api_key):
+    """Keyed HMAC of a presented API key, used as the credential cache key"""
+    return hmac.new(_CREDENTIAL_SECRET, api_key.encode('utf-8'), hashlib.sha256).hexdigest()
+
+def _cached_credential(api_key):
+    """Return (agent_name, stored_hash) for a recently verified key, or None"""
+    cred_id = _credential_id(api_key)
+    with _credential_lock:
+        entry = _credential_cache.get(cred_id)
+        if entry is None:
+            return None
+        if entry['expires_at'] < time.time():
+            del _credential_cache[cred_id]
+            return None
+        _credential_cache.move_to_end(cred_id)
+        return entry['agent_name'], entry['stored_hash']
+
+def _remember_credential(api_key, agent_name, stored_hash):
+    """Record a successful verification of api_key against stored_hash"""
+    cred_id = _credential_id(api_key)
+    with _credential_lock:
+        _credential_cache[cred_id] = {
+            'agent_name': agent_name,
+            'stored_hash': stored_hash,
+            'expires_at': time.time() + CREDENTIAL_CACHE_TTL
+        }
+        _credential_cache.move_to_end(cred_id)
+        while len(_credential_cache) > CREDENTIAL_CACHE_MAX_ENTRIES:
+            _credential_cache.popitem(last=False)
+
+def forget_credentials(agent_name=None):
+    """Drop cached verifications for one agent (e.g. after a key rotation), or all"""
+    with _credential_lock:
+        if agent_name is None:
+            _credential_cache.clear()
+            return
+        for cred_id in [k for k, v in _credential_cache.items() if v['agent_name'] == agent_name]:
+            del _credential_cache[cred_id]
+
+def _verify_agent_hash(agent_name, stored_hash, api_key):
+    """Check api_key against an agent's stored hash, skipping the KDF if recently verified"""
+    if _cached_credential(api_key) == (agent_name, stored_hash):
+        return True
     
-    # FALLBACK (O(N)): Search by iterating (Deprecated, transition to X-AGENT-NAME)
-    # This finds the agent in 1 database query but N CPU-intensive hash checks
-    return _find_agent_by_key(api_key)
+    if _check_hash(stored_hash, api_key):
+        _remember_credential(api_key, agent_name, stored_hash)
+        if agent_name != MASTER_PRINCIPAL and _needs_rehash(stored_hash):
+            submit_kdf(_rehash_agent_key, agent_name, stored_hash, api_key)
+        return True
+    return False
+
+def _needs_rehash(stored_hash):
+    """True if a stored hash uses outdated Argon2 parameters or a Werkzeug format"""
+    from app import ph
+    
+    if not ph:
+        return False
+    if stored_hash.startswith('pbkdf2:') or stored_hash.startswith('scrypt:'):
+        return True
+    try:
+        return ph.check_needs_rehash(stored_hash)
+    except Exception:
+        return False
+
+def _rehash_agent_key(agent_name, old_hash, api_key):
+    """Re-store a verified key with the current Argon2 parameters (runs on the KDF pool)"""
+    from app import supabase, ph
+    
+    try:
+        new_hash = ph.hash(api_key)
+        # Compare-and-set: skip if the key was rotated meanwhile
+        result = supabase.table('agents').update({'api_key': new_hash}) \
+            .eq('name', agent_name).eq('api_key', old_hash).execute()
+        if result.data:
+            _remember_credential(api_key, agent_name, new_hash)
+            print(f"AUTH: Rehashed API key for {agent_name} with current parameters", flush=True)
+    except Exception as e:
+        print(f"AUTH: Rehash failed for {agent_name}: {e}", flush=True)
 
 def _find_agent_by_key(api_key):
     """Find agent by key - searches efficiently"""
     from app import supabase, ph
     
+    # A recently verified key names its agent - confirm with a single-row lookup
+    cached = _cached_credential(api_key)
+    if cached:
+        agent_name = _verify_specific_agent(api_key, cached[0])
+        if agent_name:
+            return agent_name
+    
     try:
         # Get all agents with api_key set - much smaller subset
-        result = supabase.table('agents').select('name, api_key').not_.is_('api_key', 'null').execute()
+        result = supabase.table('agents').select(PRINCIPAL_FIELDS).not_.is_('api_key', 'null').execute()
         if not result.data:
             return None
             
@@ -143,9 +404,12 @@ def _find_agent_by_key(api_key):
             if not stored_hash:
                 continue
                 
-            if _check_hash(stored_hash, api_key):
+            if _verify_agent_hash(agent['name'], stored_hash, api_key):
+                _set_principal(agent)
                 return agent['name']
                 
+    except KDFBusyError:
+        raise
     except Exception as e:
         print(f"Error finding agent by key: {e}")
         
@@ -161,7 +425,7 @@ def _verify_specific_agent(api_key, agent_name):
         return None
     
     try:
-        result = supabase.table('agents').select('name, api_key').eq('name', agent_name).execute()
+        result = supabase.table('agents').select(PRINCIPAL_FIELDS).eq('name', agent_name).execute()
         if not result.data:
             return None
             
@@ -170,14 +434,42 @@ def _verify_specific_agent(api_key, agent_name):
         if not stored_hash:
             return None
             
-        if _check_hash(stored_hash, api_key):
+        if _verify_agent_hash(agent['name'], stored_hash, api_key):
+            _set_principal(agent)
             return agent['name']
                 
+    except KDFBusyError:
+        raise
     except Exception as e:
         print(f"Error verifying API key for {agent_name}: {e}")
         
     return None
 
+def _verify_by_key_id(api_key, key_id):
+    """Verify a prefixed API key by its public key_id - single indexed query"""
+    from app import supabase
+    
+    try:
+        result = supabase.table('agents').select(PRINCIPAL_FIELDS).eq('key_id', key_id).execute()
+        if not result.data:
+            return None
+            
+        agent = result.data[0]
+        stored_hash = agent['api_key']
+        if not stored_hash:
+            return None
+            
+        if _verify_agent_hash(agent['name'], stored_hash, api_key):
+            _set_principal(agent)
+            return agent['name']
+                
+    except KDFBusyError:
+        raise
+    except Exception as e:
+        print(f"Error verifying API key by id {key_id}: {e}")
+        
+    return None
+
 def _verify_all_agents(api_key):
     """Legacy: Check all agents - O(N)"""
     from app import supabase, ph
@@ -192,9 +484,11 @@ def _verify_all_agents(api_key):
             if not stored_hash:
                 continue
                 
-            if _check_hash(stored_hash, api_key):
+            if _verify_agent_hash(agent['name'], stored_hash, api_key):
                 return agent['name']
                 
+    except KDFBusyError:
+        raise
     except Exception as e:
         print(f"Error verifying API key: {e}")
         
@@ -208,22 +502,84 @@ def _check_hash(stored_hash, api_key):
     if stored_hash.startswith('$argon2'):
         if ph:
             try:
-                return ph.verify(stored_hash, api_key)
+                return run_kdf(ph.verify, stored_hash, api_key)
+            except KDFBusyError:
+                raise
             except Exception:
                 pass
     # Fallback to Werkzeug format
     elif stored_hash.startswith('pbkdf2:') or stored_hash.startswith('scrypt:'):
         try:
-            return check_password_hash(stored_hash, api_key)
+            return run_kdf(check_password_hash, stored_hash, api_key)
+        except KDFBusyError:
+            raise
         except Exception:
             pass
     # No plaintext fallback — unknown hash formats are rejected
     return False
 
-def is_core_team(agent_name):
-    """Check if agent has a core team role"""
+def _set_principal(agent, via='key'):
+    """Store the authenticated agent on flask.g for the rest of the request
+    
+    Args:
+        agent: Agent row (name, roles, faction, xp) - faction and xp are left
+               as None when the row doesn't carry them (session tokens)
+        via: How the request authenticated - 'key', 'master' or 'token'
+    """
+    from flask import g, has_app_context
+    
+    if not has_app_context():
+        return
+    g.principal = {
+        'name': agent['name'],
+        'roles': agent.get('roles') or [],
+        'faction': (agent.get('faction') or 'Wanderer') if 'faction' in agent else None,
+        'xp': float(agent.get('xp') or 0) if 'xp' in agent else None,
+        'via': via
+    }
+
+def _clear_principal():
+    """Forget any principal stored for this request"""
+    from flask import g, has_app_context
+    
+    if has_app_context():
+        g.pop('principal', None)
+
+def get_principal(agent_name=None):
+    """Get the agent authenticated for this request.
+    
+    Args:
+        agent_name: If given, only return the principal when it is this agent
+        
+    Returns:
+        Dict with name, roles, faction, xp and via, or None if no agent was
+        authenticated in this request (or it is a different agent).
+        Session-token principals carry only name and roles (faction and xp are None).
+    """
+    from flask import g, has_app_context
+    
+    if not has_app_context():
+        return None
+    principal = g.get('principal')
+    if principal is None or (agent_name is not None and principal['name'] != agent_name):
+        return None
+    return principal
+
+def _agent_roles(agent_name):
+    """Roles for an agent - from the request principal when it's the same agent"""
     from app import supabase
     
+    principal = get_principal(agent_name)
+    if principal is not None:
+        return principal['roles']
+    
+    result = supabase.table('agents').select('roles').eq('name', agent_name).execute()
+    if result.data:
+        return result.data[0].get('roles', []) or []
+    return []
+
+def is_core_team(agent_name):
+    """Check if agent has a core team role"""
     # Validate agent name to prevent injection
     is_valid, _ = validate_agent_name(agent_name)
     if not is_valid:
@@ -234,16 +590,13 @@ def is_core_team(agent_name):
         core_roles = {'editor', 'curator', 'coordinator', 'contributor', 'publisher'}
         
         # Check the roles jsonb array field
-        result = supabase.table('agents').select('roles').eq('name', agent_name).execute()
+        agent_roles = _agent_roles(agent_name)
         
-        if result.data:
-            agent_roles = result.data[0].get('roles', [])
-            # roles is a jsonb array like ["freelancer"] or ["editor", "curator"]
-            if agent_roles:
-                # Check if any of the agent's roles match core roles (case-insensitive)
-                for role in agent_roles:
-                    if role.lower() in core_roles:
-                        return True
+        # roles is a jsonb array like ["freelancer"] or ["editor", "curator"]
+        # Check if any of the agent's roles match core roles (case-insensitive)
+        for role in agent_roles:
+            if role.lower() in core_roles:
+                return True
         return False
     except:
         return False
@@ -258,25 +611,44 @@ def has_role(agent_name, role):
     Returns:
         Boolean: True if agent has the role, False otherwise
     """
-    from app import supabase
-    
     # Validate agent name to prevent injection
     is_valid, _ = validate_agent_name(agent_name)
     if not is_valid:
         return False
     
     try:
-        result = supabase.table('agents').select('roles').eq('name', agent_name).execute()
-        
-        if result.data:
-            agent_roles = result.data[0].get('roles', [])
-            if agent_roles:
-                # Check if the role matches (case-insensitive)
-                return role.lower() in [r.lower() for r in agent_roles]
-        return False
+        agent_roles = _agent_roles(agent_name)
+        # Check if the role matches (case-insensitive)
+        return role.lower() in [r.lower() for r in agent_roles]
     except:
         return False
 
+def admin_required(f):
+    """
+    Protect an admin endpoint: an /admin/ session cookie, or dual-key auth
+    (X-API-KEY of a core team agent plus X-MASTER-KEY).
+    """
+    @wraps(f)
+    def wrapped(*args, **kwargs):
+        from flask import session, request, jsonify
+        
+        if not session.get('admin_auth'):
+            api_key = request.headers.get('X-API-KEY')
+            master_key = request.headers.get('X-MASTER-KEY')
+            
+            if not api_key or not master_key:
+                return jsonify({'error': 'Dual-key authentication required (X-API-KEY and X-MASTER-KEY)'}), 401
+            
+            if not verify_master_key(master_key):
+                return jsonify({'error': 'Invalid Master Key'}), 401
+            
+            agent_name = verify_api_key(api_key)
+            if not agent_name or not is_core_team(agent_name):
+                return jsonify({'error': 'Core team authorization required'}), 403
+        
+        return f(*args, **kwargs)
+    return wrapped
+
 def get_api_key_header():
     """Get API key from request header"""
     from flask import request
@@ -3,72 +3,398 @@ Vercel-compatible caching using Supabase as backing store.
 
 Since Vercel's filesystem is ephemeral and in-memory cache is lost on cold starts,
 we use Supabase as a persistent cache layer.
+
+A small in-process LRU sits in front of the store (read-through, write-through),
+so warm instances answer repeated reads from memory and only go to the store
+on a local miss.
+
+The store itself is pluggable (see utils/cache_backends.py): Supabase by
+default, or a local SQLite file / in-memory dict via CACHE_BACKEND.
 """
-from datetime import datetime, timezone, timedelta
+import base64
+import json
+import math
+import random
+import threading
+import time
+import uuid
+import zlib
+from collections import OrderedDict
 
+from utils import cache_metrics
+from utils.cache_backends import get_backend
 
-def get_cache(key: str, ttl_seconds: int = 300):
+# In-process cache layer
+LOCAL_CACHE_MAX_ENTRIES = 256  # Bounded LRU - oldest entries are evicted first
+LOCAL_CACHE_MAX_TTL = 60  # Cap local lifetime so invalidations on other instances propagate
+
+_local_cache = OrderedDict()
+_local_lock = threading.Lock()
+
+# Stampede protection
+SINGLE_FLIGHT_WAIT_SECONDS = 30  # How long concurrent callers wait for the in-process leader
+LEASE_PREFIX = 'lease:'  # Lease rows live in cache_entries under this prefix
+LEASE_SECONDS = 30  # A lease older than this is considered abandoned
+LEASE_WAIT_SECONDS = 10  # How long to wait for another instance before computing anyway
+LEASE_POLL_INTERVAL = 0.25
+XFETCH_BETA = 1.0  # >1 refreshes earlier, <1 later
+
+# Stale-while-revalidate
+MAX_STALE_SECONDS = 3600  # Longest stale window; the janitor keeps expired rows this long
+
+# Groups of keys that go stale together - invalidate a whole group in one round trip
+CACHE_TAGS = {
+    'signals': ['signals_cache', 'stats_data', 'github_stats'],
+    'stats': ['fast_stats', 'stats_data', 'github_stats'],
+    'all': ['github_stats', 'fast_stats', 'stats_data', 'pr_metadata', 'signals_cache', 'mesh_graph'],
+}
+
+# Compression for large payloads (e.g. signals_cache carries every PR body)
+COMPRESS_MIN_BYTES = 4096  # Values smaller than this are stored as plain JSONB
+COMPRESS_LEVEL = 6
+COMPRESSED_MARKER = '_zlib_b64'  # Envelope key marking a compressed value
+
+INSTANCE_ID = uuid.uuid4().hex
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+
+def _encode(data):
+    """
+    Compress a value for storage if it is large enough to be worth it.
+    
+    Returns:
+        Tuple of (stored value, original size in bytes, stored size in bytes)
+    """
+    raw = json.dumps(data, separators=(',', ':'), default=str).encode('utf-8')
+    if len(raw) < COMPRESS_MIN_BYTES:
+        return data, len(raw), len(raw)
+    
+    packed = base64.b64encode(zlib.compress(raw, COMPRESS_LEVEL)).decode('ascii')
+    if len(packed) >= len(raw):
+        return data, len(raw), len(raw)  # Incompressible - keep it readable
+    return {COMPRESSED_MARKER: packed}, len(raw), len(packed)
+
+
+def _decode(stored):
+    """Reverse _encode - plain values pass through unchanged."""
+    if isinstance(stored, dict) and COMPRESSED_MARKER in stored and len(stored) == 1:
+        return json.loads(zlib.decompress(base64.b64decode(stored[COMPRESSED_MARKER])))
+    return stored
+
+
+def _local_get(key: str):
+    """Return the local entry for key, or None if missing or past its local lifetime."""
+    with _local_lock:
+        entry = _local_cache.get(key)
+        if entry is None:
+            return None
+        if time.time() >= entry['local_expires']:
+            del _local_cache[key]
+            return None
+        _local_cache.move_to_end(key)
+        return entry
+
+
+def _local_set(key: str, data, expires_at=None, updated_at=None, keep_until=None, compute_seconds=None):
+    """
+    Store an entry in the in-process layer.
+    
+    Args:
+        key: Cache key
+        data: Cached payload
+        expires_at: Epoch seconds when the entry stops being fresh (None = no expiry)
+        updated_at: Epoch seconds when the entry was written (defaults to now)
+        keep_until: Epoch seconds to retain the entry locally (defaults to expires_at);
+                    lets stale-while-revalidate keep serving past freshness
+        compute_seconds: How long the value took to compute (used for early refresh)
     """
-    Get cached data from Supabase if not expired.
+    now = time.time()
+    local_expires = now + LOCAL_CACHE_MAX_TTL
+    retain = keep_until if keep_until is not None else expires_at
+    if retain is not None:
+        local_expires = min(local_expires, retain)
+    
+    with _local_lock:
+        _local_cache[key] = {
+            'data': data,
+            'expires_at': expires_at,
+            'updated_at': updated_at if updated_at is not None else now,
+            'compute_seconds': compute_seconds,
+            'local_expires': local_expires
+        }
+        _local_cache.move_to_end(key)
+        while len(_local_cache) > LOCAL_CACHE_MAX_ENTRIES:
+            _local_cache.popitem(last=False)
+
+
+def _local_delete(key: str):
+    """Drop a key from the in-process layer."""
+    with _local_lock:
+        _local_cache.pop(key, None)
+
+
+def clear_local_cache():
+    """Drop every entry from the in-process layer (Supabase is untouched)."""
+    with _local_lock:
+        _local_cache.clear()
+
+
+def _get_entry(key: str, allow_expired: bool = False, record_metrics: bool = True):
+    """
+    Look up a cache entry - memory first, then the backing store.
     
     Args:
         key: Cache key to look up
-        ttl_seconds: Time-to-live in seconds (used for expiration check)
+        allow_expired: Return entries past expires_at instead of treating them as misses
+        record_metrics: Count a local hit in cache_metrics; False for internal
+                        lookups (ETag versions, lease polling) that aren't reads
     
     Returns:
-        Cached data dict or None if not found/expired
+        Entry dict (data, expires_at, updated_at, compute_seconds as epoch/seconds)
+        or None if not found
     """
-    from app import supabase
+    now = time.time()
+    entry = _local_get(key)
+    if entry is not None and (allow_expired or entry['expires_at'] is None or now < entry['expires_at']):
+        if record_metrics:
+            cache_metrics.record(key, 'local_hits')
+        return entry
+    
+    backend = get_backend()
     
-    if not supabase:
+    if not backend.available():
         return None
     
     try:
-        result = supabase.table('cache_entries').select('data, expires_at').eq('key', key).execute()
-        if result.data:
-            entry = result.data[0]
-            # Check expiration
-            expires_at = entry.get('expires_at')
-            if expires_at:
-                expires_dt = datetime.fromisoformat(expires_at.replace('Z', '+00:00'))
-                if datetime.now(timezone.utc) > expires_dt:
-                    return None  # Expired
-            return entry['data']
+        rows = backend.fetch([key])
+        if rows:
+            row = rows[0]
+            entry = {
+                'data': _decode(row.get('data')),
+                'expires_at': row.get('expires_at'),
+                'updated_at': row.get('updated_at') or now,
+                'compute_seconds': row.get('compute_seconds'),
+                'from_store': True
+            }
+            if entry['expires_at'] is not None and now > entry['expires_at']:
+                return entry if allow_expired else None  # Expired
+            _local_set(key, entry['data'], entry['expires_at'], entry['updated_at'],
+                       compute_seconds=entry['compute_seconds'])
+            return entry
     except Exception as e:
         print(f"CACHE GET ERROR ({key}): {e}")
     return None
 
 
-def set_cache(key: str, data: dict, ttl_seconds: int = 300):
+def get_cache(key: str, ttl_seconds: int = 300):
     """
-    Store data in Supabase cache with TTL.
+    Get cached data if not expired - memory first, then the backing store.
+    
+    Args:
+        key: Cache key to look up
+        ttl_seconds: Time-to-live in seconds (used for expiration check)
+    
+    Returns:
+        Cached data dict or None if not found/expired
+    """
+    entry = _get_entry(key)
+    cache_metrics.record(key, 'hits' if entry is not None else 'misses')
+    return entry['data'] if entry is not None else None
+
+
+def get_cache_version(key: str):
+    """
+    Return an opaque version string for the currently stored value of key.
+    
+    Changes whenever the entry is rewritten, so it can back an HTTP ETag
+    without re-serializing the payload. None if nothing is cached.
+    """
+    entry = _get_entry(key, allow_expired=True, record_metrics=False)
+    if entry is None or entry.get('updated_at') is None:
+        return None
+    return f"{key}:{entry['updated_at']:.6f}"
+
+
+def set_cache(key: str, data: dict, ttl_seconds: int = 300, compute_seconds: float = None):
+    """
+    Store data in the local layer and the backing store with TTL (write-through).
     
     Args:
         key: Cache key to store under
         data: Data dict to cache
         ttl_seconds: Time-to-live in seconds
+        compute_seconds: How long the value took to compute (drives early refresh)
     
     Returns:
         True if successful, False otherwise
     """
-    from app import supabase
+    now = time.time()
+    expires_at = now + ttl_seconds
+    _local_set(key, data, expires_at, now, compute_seconds=compute_seconds)
+    
+    backend = get_backend()
     
-    if not supabase:
+    if not backend.available():
         return False
     
     try:
-        expires_at = (datetime.now(timezone.utc) + timedelta(seconds=ttl_seconds)).isoformat()
-        supabase.table('cache_entries').upsert({
+        stored, raw_size, stored_size = _encode(data)
+        cache_metrics.record_payload(key, raw_size, stored_size)
+        backend.upsert([{
             'key': key,
-            'data': data,
-            'expires_at': expires_at
-        }, on_conflict='key').execute()
+            'data': stored,
+            'expires_at': expires_at,
+            'updated_at': now,
+            'compute_seconds': compute_seconds,
+            'raw_size': raw_size,
+            'stored_size': stored_size
+        }])
         return True
     except Exception as e:
         print(f"CACHE SET ERROR ({key}): {e}")
         return False
 
 
+def _should_refresh_early(entry):
+    """
+    XFetch probabilistic early expiration.
+    
+    Each reader recomputes early with a probability that grows as expiry nears
+    and as the value gets more expensive to compute, so hot keys are refreshed
+    by one caller shortly before they expire instead of by everyone at once.
+    """
+    delta = entry.get('compute_seconds')
+    expires_at = entry.get('expires_at')
+    if not delta or expires_at is None:
+        return False
+    # 1 - random() is in (0, 1], so log() is always defined
+    return time.time() - delta * XFETCH_BETA * math.log(1.0 - random.random()) >= expires_at
+
+
+def _acquire_lease(key: str):
+    """
+    Try to take the distributed compute lease for a key.
+    
+    The lease is a short-lived row in the cache store, so only one serverless
+    instance recomputes a missing key at a time.
+    
+    Returns:
+        True if acquired, False if another instance holds it,
+        None if leasing is unavailable (no store or unexpected error)
+    """
+    backend = get_backend()
+    
+    if not backend.available():
+        return None
+    
+    lease_key = f"{LEASE_PREFIX}{key}"
+    now = time.time()
+    try:
+        # Reclaim a lease abandoned by a crashed or timed-out instance
+        backend.delete([lease_key], expired_only=True)
+        return backend.insert({
+            'key': lease_key,
+            'data': {'instance': INSTANCE_ID},
+            'updated_at': now,
+            'expires_at': now + LEASE_SECONDS
+        })
+    except Exception as e:
+        print(f"CACHE LEASE ERROR ({key}): {e}")
+        return None
+
+
+def _release_lease(key: str):
+    """Release a distributed compute lease held by this instance."""
+    backend = get_backend()
+    
+    if not backend.available():
+        return
+    
+    try:
+        backend.delete([f"{LEASE_PREFIX}{key}"])
+    except Exception as e:
+        print(f"CACHE LEASE RELEASE ERROR ({key}): {e}")
+
+
+def _wait_for_remote(key: str):
+    """Poll for a value another instance is computing; None if it does not show up in time."""
+    deadline = time.time() + LEASE_WAIT_SECONDS
+    while time.time() < deadline:
+        time.sleep(LEASE_POLL_INTERVAL)
+        entry = _get_entry(key, record_metrics=False)
+        if entry is not None:
+            return entry['data']
+    return None
+
+
+def _compute_and_store(key: str, compute_fn, ttl_seconds: int, fallback=None):
+    """
+    Compute a value under the distributed lease and write it through the cache.
+    
+    Args:
+        key: Cache key being computed
+        compute_fn: Callable that returns data to cache
+        ttl_seconds: Time-to-live in seconds
+        fallback: Still-usable cached value (early refresh) to return if
+                  another instance is already recomputing
+    """
+    lease = _acquire_lease(key)
+    if lease is False:
+        if fallback is not None:
+            return fallback
+        print(f"CACHE WAIT: {key} (computing on another instance)")
+        data = _wait_for_remote(key)
+        if data is not None:
+            return data
+        # Lease holder is too slow or died - compute ourselves rather than fail
+    
+    try:
+        start = time.time()
+        data = compute_fn()
+        elapsed = time.time() - start
+        cache_metrics.record_compute(key, elapsed)
+        if data:
+            set_cache(key, data, ttl_seconds, compute_seconds=elapsed)
+        return data
+    finally:
+        if lease:
+            _release_lease(key)
+
+
+def _single_flight(key: str, compute_fn, ttl_seconds: int, fallback=None):
+    """
+    Coalesce concurrent computes of the same key within this process.
+    
+    The first caller computes; concurrent callers wait for its result instead
+    of running compute_fn in parallel.
+    """
+    with _inflight_lock:
+        flight = _inflight.get(key)
+        leader = flight is None
+        if leader:
+            flight = {'event': threading.Event(), 'result': None}
+            _inflight[key] = flight
+    
+    if not leader:
+        if fallback is not None:
+            return fallback
+        flight['event'].wait(SINGLE_FLIGHT_WAIT_SECONDS)
+        if flight['result'] is not None:
+            return flight['result']
+        # Leader failed or timed out - fall back to computing directly
+        return compute_fn()
+    
+    try:
+        data = _compute_and_store(key, compute_fn, ttl_seconds, fallback)
+        flight['result'] = data
+        return data
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+        flight['event'].set()
+
+
 def get_or_compute(key: str, compute_fn, ttl_seconds: int = 300):
     """
     Get from cache or compute and cache the result.
@@ -76,6 +402,8 @@ def get_or_compute(key: str, compute_fn, ttl_seconds: int = 300):
     This is the main entry point for cached data access.
     If cache hit, returns cached data immediately.
     If cache miss, calls compute_fn(), caches result, and returns it.
+    Concurrent misses for the same key are coalesced (in process and across
+    instances via a lease row), and hot keys are refreshed slightly early.
     
     Args:
         key: Cache key to look up
@@ -85,79 +413,136 @@ def get_or_compute(key: str, compute_fn, ttl_seconds: int = 300):
     Returns:
         Cached or computed data dict
     """
-    cached = get_cache(key, ttl_seconds)
-    if cached is not None:
-        print(f"CACHE HIT: {key}")
-        return cached
+    entry = _get_entry(key)
+    if entry is not None:
+        cache_metrics.record(key, 'hits')
+        if not _should_refresh_early(entry):
+            print(f"CACHE HIT: {key}")
+            return entry['data']
+        print(f"CACHE EARLY REFRESH: {key}")
+        cache_metrics.record(key, 'early_refreshes')
+        return _single_flight(key, compute_fn, ttl_seconds, fallback=entry['data'])
     
     print(f"CACHE MISS: {key}")
-    data = compute_fn()
-    if data:
-        set_cache(key, data, ttl_seconds)
-    return data
+    cache_metrics.record(key, 'misses')
+    return _single_flight(key, compute_fn, ttl_seconds)
 
 
-def get_stale_or_compute(key: str, compute_fn, ttl_seconds: int = 300, stale_seconds: int = 3600):
+def recompute_cache(key: str, compute_fn, ttl_seconds: int = 300):
+    """
+    Recompute a key unconditionally and write it through the cache.
+    
+    Used to warm caches ahead of visitors. Goes through the same single-flight
+    and lease path as a miss, so a warm-up racing real traffic computes once.
+    
+    Args:
+        key: Cache key to refresh
+        compute_fn: Callable that returns data to cache
+        ttl_seconds: Time-to-live in seconds
+    
+    Returns:
+        Computed data dict
+    """
+    print(f"CACHE WARM: {key}")
+    return _single_flight(key, compute_fn, ttl_seconds)
+
+
+def _with_cache_meta(data, updated_at: float, expires_at):
+    """
+    Tag a cached dict with its freshness so callers and the frontend can show it.
+    
+    Only absolute timestamps are added (the reader works out age and staleness),
+    so the body stays identical for as long as the stored entry does - which is
+    what lets get_cache_version() back an ETag for it.
+    
+    Returns a shallow copy - the cached object itself is never modified.
+    """
+    if not isinstance(data, dict):
+        return data
+    return {**data, 'cache_meta': {'updated_at': round(updated_at, 3),
+                                   'expires_at': round(expires_at, 3) if expires_at is not None else None}}
+
+
+def _refresh_in_background(key: str, compute_fn, ttl_seconds: int, current):
+    """Start one background recompute for key unless one is already running."""
+    with _inflight_lock:
+        if key in _inflight:
+            return
+    
+    def refresh():
+        try:
+            _single_flight(key, compute_fn, ttl_seconds, fallback=current)
+            print(f"CACHE REVALIDATED: {key}", flush=True)
+        except Exception as e:
+            print(f"CACHE REVALIDATE ERROR ({key}): {e}", flush=True)
+    
+    threading.Thread(target=refresh, daemon=True).start()
+
+
+def get_stale_or_compute(key: str, compute_fn, ttl_seconds: int = 300, stale_seconds: int = MAX_STALE_SECONDS):
     """
     Get from cache (even if stale) or compute.
     
     Stale-while-revalidate pattern:
     - Return cached data immediately even if expired (up to stale_seconds)
+    - If the returned data is past its TTL, recompute once in the background
     - If no cache or too stale, compute fresh data
     
+    Dict results carry a 'cache_meta' entry with the epoch times the value was
+    computed and goes stale, from which the frontend shows its age.
+    
     Args:
         key: Cache key to look up
         compute_fn: Callable that returns data to cache
         ttl_seconds: Fresh TTL in seconds
-        stale_seconds: Maximum stale age in seconds (default 1 hour)
+        stale_seconds: Maximum stale age in seconds (default and upper bound:
+                       MAX_STALE_SECONDS, which the janitor honours)
     
     Returns:
         Cached (possibly stale) or computed data dict
     """
-    from app import supabase, init_supabase
-    
-    # Initialize supabase if needed
-    if supabase is None:
-        init_supabase()
-        from app import supabase
+    stale_seconds = min(stale_seconds, MAX_STALE_SECONDS)
+    entry = _get_entry(key, allow_expired=True)
+    if entry is not None and entry['data']:
+        # Check if data is within stale window
+        now = time.time()
+        age = now - entry['updated_at']
+        
+        # Return if within stale window (even if past TTL)
+        if age < stale_seconds:
+            stale = entry['expires_at'] is not None and now >= entry['expires_at']
+            # Keep a row just read from the store locally for the rest of its stale
+            # window (still capped at LOCAL_CACHE_MAX_TTL). Local hits must not
+            # re-set it - that would keep pushing local_expires forward and hide
+            # newer rows written by other instances.
+            if entry.get('from_store'):
+                _local_set(key, entry['data'], entry['expires_at'], entry['updated_at'],
+                           keep_until=entry['updated_at'] + stale_seconds,
+                           compute_seconds=entry.get('compute_seconds'))
+            if stale:
+                print(f"CACHE STALE HIT: {key} (age: {age:.0f}s)")
+                cache_metrics.record(key, 'stale_hits')
+                _refresh_in_background(key, compute_fn, ttl_seconds, entry['data'])
+            else:
+                print(f"CACHE HIT: {key}")
+                cache_metrics.record(key, 'hits')
+            return _with_cache_meta(entry['data'], entry['updated_at'], entry['expires_at'])
     
-    if not supabase:
+    if not get_backend().available():
+        cache_metrics.record(key, 'misses')
         return compute_fn()
     
-    try:
-        result = supabase.table('cache_entries').select('data, updated_at').eq('key', key).execute()
-        if result.data:
-            entry = result.data[0]
-            data = entry.get('data')
-            updated_at = entry.get('updated_at')
-            
-            if data and updated_at:
-                # Check if data is within stale window
-                from datetime import datetime, timezone, timedelta
-                try:
-                    updated_dt = datetime.fromisoformat(updated_at.replace('Z', '+00:00'))
-                    age = (datetime.now(timezone.utc) - updated_dt).total_seconds()
-                    
-                    # Return if within stale window (even if past TTL)
-                    if age < stale_seconds:
-                        print(f"CACHE STALE HIT: {key} (age: {age:.0f}s)")
-                        return data
-                except:
-                    pass
-    except Exception as e:
-        print(f"CACHE STALE ERROR ({key}): {e}")
-    
     # Cache miss or too stale - compute fresh
     print(f"CACHE STALE MISS: {key}")
-    data = compute_fn()
-    if data:
-        set_cache(key, data, ttl_seconds)
-    return data
+    cache_metrics.record(key, 'misses')
+    computed_at = time.time()
+    return _with_cache_meta(_single_flight(key, compute_fn, ttl_seconds),
+                            computed_at, computed_at + ttl_seconds)
 
 
 def invalidate_cache(key: str):
     """
-    Remove a cache entry.
+    Remove a cache entry from the local layer and the backing store.
     
     Args:
         key: Cache key to remove
@@ -165,40 +550,175 @@ def invalidate_cache(key: str):
     Returns:
         True if successful, False otherwise
     """
-    from app import supabase, init_supabase
+    _local_delete(key)
     
-    if supabase is None:
-        init_supabase()
-        from app import supabase
+    backend = get_backend()
     
-    if not supabase:
+    if not backend.available():
         return False
     
     try:
-        supabase.table('cache_entries').delete().eq('key', key).execute()
+        backend.delete([key])
         return True
     except Exception as e:
         print(f"CACHE INVALIDATE ERROR ({key}): {e}")
         return False
 
 
-def clean_expired_cache():
+def get_many(keys):
+    """
+    Get several non-expired cache entries - memory first, then one store query.
+    
+    Args:
+        keys: Iterable of cache keys
+    
+    Returns:
+        Dict of key -> cached data for every key that was found and fresh
+    """
+    found = {}
+    missing = []
+    now = time.time()
+    for key in keys:
+        entry = _local_get(key)
+        if entry is not None and (entry['expires_at'] is None or now < entry['expires_at']):
+            found[key] = entry['data']
+        else:
+            missing.append(key)
+    
+    if not missing:
+        return found
+    
+    backend = get_backend()
+    
+    if not backend.available():
+        return found
+    
+    try:
+        for row in backend.fetch(missing):
+            expires_ts = row.get('expires_at')
+            if expires_ts is not None and now > expires_ts:
+                continue  # Expired
+            data = _decode(row.get('data'))
+            _local_set(row['key'], data, expires_ts, row.get('updated_at'),
+                       compute_seconds=row.get('compute_seconds'))
+            found[row['key']] = data
+    except Exception as e:
+        print(f"CACHE GET MANY ERROR ({', '.join(missing)}): {e}")
+    return found
+
+
+def set_many(items: dict, ttl_seconds: int = 300):
+    """
+    Store several entries with the same TTL in one upsert.
+    
+    Args:
+        items: Dict of key -> data to cache
+        ttl_seconds: Time-to-live in seconds
+    
+    Returns:
+        True if successful, False otherwise
+    """
+    if not items:
+        return True
+    
+    now = time.time()
+    expires_at = now + ttl_seconds
+    for key, data in items.items():
+        _local_set(key, data, expires_at, now)
+    
+    backend = get_backend()
+    
+    if not backend.available():
+        return False
+    
+    try:
+        rows = []
+        for key, data in items.items():
+            stored, raw_size, stored_size = _encode(data)
+            cache_metrics.record_payload(key, raw_size, stored_size)
+            rows.append({
+                'key': key,
+                'data': stored,
+                'expires_at': expires_at,
+                'updated_at': now,
+                'raw_size': raw_size,
+                'stored_size': stored_size
+            })
+        backend.upsert(rows)
+        return True
+    except Exception as e:
+        print(f"CACHE SET MANY ERROR ({', '.join(items)}): {e}")
+        return False
+
+
+def invalidate_many(keys):
+    """
+    Remove several cache entries in one delete.
+    
+    Args:
+        keys: Iterable of cache keys to remove
+    
+    Returns:
+        True if successful, False otherwise
     """
-    Remove all expired cache entries.
-    Can be called periodically or via cron job.
+    keys = list(keys)
+    if not keys:
+        return True
+    
+    for key in keys:
+        _local_delete(key)
+    
+    backend = get_backend()
+    
+    if not backend.available():
+        return False
+    
+    try:
+        backend.delete(keys)
+        return True
+    except Exception as e:
+        print(f"CACHE INVALIDATE MANY ERROR ({', '.join(keys)}): {e}")
+        return False
+
+
+def invalidate_tag(tag: str):
+    """
+    Remove every cache entry in a CACHE_TAGS group.
+    
+    Args:
+        tag: Group name (e.g. 'signals')
+    
+    Returns:
+        List of keys cleared (empty if the tag is unknown or the delete failed)
+    """
+    keys = CACHE_TAGS.get(tag, [])
+    if keys and invalidate_many(keys):
+        return list(keys)
+    return []
+
+
+def clean_expired_cache(limit: int = None):
+    """
+    Remove expired cache entries.
+    Called in bounded batches by the janitor (utils/janitor.py).
+    
+    Rows are only removed once they have been expired for MAX_STALE_SECONDS,
+    so entries still inside a stale-while-revalidate window keep being served
+    instead of forcing a cold compute.
+    
+    Args:
+        limit: Maximum number of entries to remove (all if None)
     
     Returns:
         Number of entries removed, or -1 on error
     """
-    from app import supabase
+    backend = get_backend()
     
-    if not supabase:
+    if not backend.available():
         return -1
     
     try:
-        now = datetime.now(timezone.utc).isoformat()
-        result = supabase.table('cache_entries').delete().lt('expires_at', now).execute()
-        return len(result.data) if result.data else 0
+        return backend.delete_expired(limit, grace_seconds=MAX_STALE_SECONDS)
     except Exception as e:
         print(f"CACHE CLEAN ERROR: {e}")
         return -1
\ No newline at end of file
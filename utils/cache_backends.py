@@ -0,0 +1,325 @@
+"""
+Storage backends for utils/cache.py.
+
+The cache layer talks to a backend through a small row-level interface, so the
+same caching logic (local LRU, single-flight, SWR, compression) can run on:
+
+- SupabaseCacheBackend: the cache_entries table (default, works on Vercel)
+- SQLiteCacheBackend: a local SQLite file for long-running self-hosted
+  deployments and benchmark runs - no network hop
+- MemoryCacheBackend: a process-local dict for tests and offline runs
+
+Select one with the CACHE_BACKEND environment variable ('supabase', 'sqlite'
+or 'memory'). CACHE_SQLITE_PATH overrides the SQLite file location.
+
+Rows exchanged with a backend are dicts with: key, data (already encoded for
+storage), updated_at and expires_at (epoch seconds, expires_at may be None),
+compute_seconds, raw_size and stored_size.
+"""
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+
+ROW_FIELDS = ('key', 'data', 'updated_at', 'expires_at', 'compute_seconds', 'raw_size', 'stored_size')
+
+
+def _to_iso(ts):
+    """Epoch seconds -> ISO timestamp for Supabase (None passes through)."""
+    if ts is None:
+        return None
+    return datetime.fromtimestamp(ts, timezone.utc).isoformat()
+
+
+def _from_iso(value):
+    """Supabase ISO timestamp -> epoch seconds (None if missing/invalid)."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+    except Exception:
+        return None
+
+
+class CacheBackend:
+    """Interface every cache backend implements."""
+
+    name = 'base'
+
+    def available(self):
+        """Return True if the backend can currently serve requests."""
+        raise NotImplementedError
+
+    def fetch(self, keys):
+        """Return the stored rows for the given keys (missing keys are skipped)."""
+        raise NotImplementedError
+
+    def upsert(self, rows):
+        """Insert or replace rows by key."""
+        raise NotImplementedError
+
+    def insert(self, row):
+        """Insert a row only if its key is absent. Returns True if inserted."""
+        raise NotImplementedError
+
+    def delete(self, keys, expired_only=False):
+        """Delete rows by key (only those past expires_at if expired_only)."""
+        raise NotImplementedError
+
+    def delete_expired(self, limit=None, grace_seconds=0):
+        """Delete up to limit rows expired more than grace_seconds ago (all if None).
+        Returns the number removed."""
+        raise NotImplementedError
+
+
+class SupabaseCacheBackend(CacheBackend):
+    """cache_entries table in Supabase - persistent across serverless instances."""
+
+    name = 'supabase'
+
+    def _client(self):
+        from app import supabase, init_supabase
+
+        # Initialize supabase if needed
+        if supabase is None:
+            init_supabase()
+            from app import supabase
+        return supabase
+
+    def available(self):
+        return bool(self._client())
+
+    def fetch(self, keys):
+        keys = list(keys)
+        query = self._client().table('cache_entries').select(
+            'key, data, updated_at, expires_at, compute_seconds, raw_size, stored_size')
+        if len(keys) == 1:
+            query = query.eq('key', keys[0])
+        else:
+            query = query.in_('key', keys)
+        result = query.execute()
+
+        rows = []
+        for row in (result.data or []):
+            row = dict(row)
+            row['updated_at'] = _from_iso(row.get('updated_at'))
+            row['expires_at'] = _from_iso(row.get('expires_at'))
+            rows.append(row)
+        return rows
+
+    def _serialize(self, row):
+        out = {field: row.get(field) for field in ROW_FIELDS if field in row}
+        out['updated_at'] = _to_iso(row.get('updated_at'))
+        out['expires_at'] = _to_iso(row.get('expires_at'))
+        return out
+
+    def upsert(self, rows):
+        payload = [self._serialize(row) for row in rows]
+        self._client().table('cache_entries').upsert(
+            payload[0] if len(payload) == 1 else payload, on_conflict='key').execute()
+
+    def insert(self, row):
+        try:
+            self._client().table('cache_entries').insert(self._serialize(row)).execute()
+            return True
+        except Exception as e:
+            message = str(e).lower()
+            if '23505' in message or 'duplicate' in message:
+                return False
+            raise
+
+    def delete(self, keys, expired_only=False):
+        keys = list(keys)
+        query = self._client().table('cache_entries').delete()
+        query = query.eq('key', keys[0]) if len(keys) == 1 else query.in_('key', keys)
+        if expired_only:
+            query = query.lt('expires_at', _to_iso(time.time()))
+        query.execute()
+
+    def delete_expired(self, limit=None, grace_seconds=0):
+        supabase = self._client()
+        cutoff = _to_iso(time.time() - grace_seconds)
+        if limit is None:
+            result = supabase.table('cache_entries').delete().lt('expires_at', cutoff).execute()
+            return len(result.data) if result.data else 0
+
+        # PostgREST deletes have no LIMIT - select a bounded batch of keys first
+        batch = supabase.table('cache_entries').select('key').lt('expires_at', cutoff).limit(limit).execute()
+        keys = [row['key'] for row in (batch.data or [])]
+        if not keys:
+            return 0
+        result = supabase.table('cache_entries').delete().in_('key', keys).lt('expires_at', cutoff).execute()
+        return len(result.data) if result.data else 0
+
+
+class MemoryCacheBackend(CacheBackend):
+    """Process-local dict - for tests and offline runs (not shared between instances)."""
+
+    name = 'memory'
+
+    def __init__(self):
+        self._rows = {}
+        self._lock = threading.Lock()
+
+    def available(self):
+        return True
+
+    def fetch(self, keys):
+        with self._lock:
+            return [dict(self._rows[key]) for key in keys if key in self._rows]
+
+    def upsert(self, rows):
+        with self._lock:
+            for row in rows:
+                self._rows[row['key']] = dict(row)
+
+    def insert(self, row):
+        with self._lock:
+            if row['key'] in self._rows:
+                return False
+            self._rows[row['key']] = dict(row)
+            return True
+
+    def delete(self, keys, expired_only=False):
+        now = time.time()
+        with self._lock:
+            for key in keys:
+                row = self._rows.get(key)
+                if row is None:
+                    continue
+                if expired_only and (row.get('expires_at') is None or row['expires_at'] >= now):
+                    continue
+                del self._rows[key]
+
+    def delete_expired(self, limit=None, grace_seconds=0):
+        cutoff = time.time() - grace_seconds
+        with self._lock:
+            expired = [key for key, row in self._rows.items()
+                       if row.get('expires_at') is not None and row['expires_at'] < cutoff]
+            if limit is not None:
+                expired = expired[:limit]
+            for key in expired:
+                del self._rows[key]
+            return len(expired)
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """Local SQLite file - sub-millisecond operations for long-running single-host deployments."""
+
+    name = 'sqlite'
+
+    def __init__(self, path=None):
+        self.path = path or os.environ.get('CACHE_SQLITE_PATH') or os.path.join(tempfile.gettempdir(), 'the_scroll_cache.sqlite3')
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS cache_entries (
+                key TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                updated_at REAL,
+                expires_at REAL,
+                compute_seconds REAL,
+                raw_size INTEGER,
+                stored_size INTEGER
+            )
+        ''')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_cache_expires ON cache_entries(expires_at)')
+
+    def available(self):
+        return True
+
+    def _values(self, row):
+        return (
+            row['key'],
+            json.dumps(row.get('data'), separators=(',', ':'), default=str),
+            row.get('updated_at'),
+            row.get('expires_at'),
+            row.get('compute_seconds'),
+            row.get('raw_size'),
+            row.get('stored_size')
+        )
+
+    def fetch(self, keys):
+        keys = list(keys)
+        placeholders = ','.join('?' * len(keys))
+        with self._lock:
+            cursor = self._conn.execute(
+                f'SELECT {", ".join(ROW_FIELDS)} FROM cache_entries WHERE key IN ({placeholders})', keys)
+            results = cursor.fetchall()
+
+        rows = []
+        for values in results:
+            row = dict(zip(ROW_FIELDS, values))
+            row['data'] = json.loads(row['data'])
+            rows.append(row)
+        return rows
+
+    def upsert(self, rows):
+        with self._lock:
+            self._conn.executemany(
+                f'INSERT OR REPLACE INTO cache_entries ({", ".join(ROW_FIELDS)}) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                [self._values(row) for row in rows])
+
+    def insert(self, row):
+        with self._lock:
+            cursor = self._conn.execute(
+                f'INSERT OR IGNORE INTO cache_entries ({", ".join(ROW_FIELDS)}) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                self._values(row))
+            return cursor.rowcount == 1
+
+    def delete(self, keys, expired_only=False):
+        keys = list(keys)
+        placeholders = ','.join('?' * len(keys))
+        sql = f'DELETE FROM cache_entries WHERE key IN ({placeholders})'
+        params = keys
+        if expired_only:
+            sql += ' AND expires_at < ?'
+            params = keys + [time.time()]
+        with self._lock:
+            self._conn.execute(sql, params)
+
+    def delete_expired(self, limit=None, grace_seconds=0):
+        cutoff = time.time() - grace_seconds
+        with self._lock:
+            if limit is None:
+                cursor = self._conn.execute('DELETE FROM cache_entries WHERE expires_at < ?', (cutoff,))
+            else:
+                cursor = self._conn.execute(
+                    'DELETE FROM cache_entries WHERE key IN '
+                    '(SELECT key FROM cache_entries WHERE expires_at < ? LIMIT ?)', (cutoff, limit))
+            return cursor.rowcount
+
+
+BACKENDS = {
+    'supabase': SupabaseCacheBackend,
+    'sqlite': SQLiteCacheBackend,
+    'memory': MemoryCacheBackend,
+}
+
+_backend = {'value': None}
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    """Return the configured backend (CACHE_BACKEND env var, default 'supabase')."""
+    if _backend['value'] is None:
+        with _backend_lock:
+            if _backend['value'] is None:
+                name = os.environ.get('CACHE_BACKEND', 'supabase').strip().lower()
+                backend_cls = BACKENDS.get(name)
+                if backend_cls is None:
+                    print(f"CACHE WARNING: Unknown CACHE_BACKEND '{name}', using supabase", flush=True)
+                    backend_cls = SupabaseCacheBackend
+                _backend['value'] = backend_cls()
+                print(f"STARTUP: Cache backend: {_backend['value'].name}", flush=True)
+    return _backend['value']
+
+
+def set_backend(backend):
+    """Replace the active backend (e.g. a MemoryCacheBackend in tests)."""
+    with _backend_lock:
+        _backend['value'] = backend
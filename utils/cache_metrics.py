@@ -0,0 +1,113 @@
+"""
+In-process cache metrics.
+
+Per-key counters (hits, misses, stale hits, ...), compute-latency histograms
+and payload sizes. Counters live in memory for the lifetime of the instance and
+a snapshot is periodically flushed to the logs as a single JSON line.
+"""
+import json
+import threading
+import time
+from datetime import datetime, timezone
+
+# Upper bounds (seconds) of the compute-latency histogram buckets
+COMPUTE_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+METRICS_FLUSH_SECONDS = 300  # Log a snapshot at most every 5 minutes
+
+_metrics = {}
+_metrics_lock = threading.Lock()
+_started_at = datetime.now(timezone.utc).isoformat()
+_last_flush = {'value': time.time()}
+
+
+def _key_metrics(key: str):
+    """Return the metrics dict for key, creating it if needed (caller holds the lock)."""
+    m = _metrics.get(key)
+    if m is None:
+        m = {
+            'hits': 0,
+            'local_hits': 0,
+            'misses': 0,
+            'stale_hits': 0,
+            'early_refreshes': 0,
+            'computes': 0,
+            'compute_seconds_total': 0.0,
+            'compute_seconds_max': 0.0,
+            'compute_histogram': [0] * (len(COMPUTE_BUCKETS) + 1),
+            'raw_size': None,
+            'stored_size': None
+        }
+        _metrics[key] = m
+    return m
+
+
+def record(key: str, counter: str, amount: int = 1):
+    """Increment a counter ('hits', 'misses', 'stale_hits', ...) for a cache key."""
+    with _metrics_lock:
+        _key_metrics(key)[counter] += amount
+    maybe_flush()
+
+
+def record_compute(key: str, seconds: float):
+    """Record how long computing a value for key took."""
+    bucket = len(COMPUTE_BUCKETS)
+    for i, bound in enumerate(COMPUTE_BUCKETS):
+        if seconds <= bound:
+            bucket = i
+            break
+
+    with _metrics_lock:
+        m = _key_metrics(key)
+        m['computes'] += 1
+        m['compute_seconds_total'] += seconds
+        m['compute_seconds_max'] = max(m['compute_seconds_max'], seconds)
+        m['compute_histogram'][bucket] += 1
+    maybe_flush()
+
+
+def record_payload(key: str, raw_size: int, stored_size: int):
+    """Record the latest original and stored payload size for key."""
+    with _metrics_lock:
+        m = _key_metrics(key)
+        m['raw_size'] = raw_size
+        m['stored_size'] = stored_size
+
+
+def snapshot():
+    """
+    Return a JSON-serializable copy of all metrics.
+
+    Returns:
+        Dict with instance start time, histogram bucket bounds and per-key metrics
+        (including derived hit_ratio and compute_seconds_avg)
+    """
+    with _metrics_lock:
+        keys = {}
+        for key, m in _metrics.items():
+            entry = dict(m)
+            entry['compute_histogram'] = list(m['compute_histogram'])
+            lookups = m['hits'] + m['stale_hits'] + m['misses']
+            entry['hit_ratio'] = round((m['hits'] + m['stale_hits']) / lookups, 4) if lookups else None
+            entry['compute_seconds_avg'] = round(m['compute_seconds_total'] / m['computes'], 4) if m['computes'] else None
+            keys[key] = entry
+
+    return {
+        'since': _started_at,
+        'compute_buckets': list(COMPUTE_BUCKETS) + ['inf'],
+        'keys': keys
+    }
+
+
+def maybe_flush(force: bool = False):
+    """Log a metrics snapshot if the flush interval has passed."""
+    now = time.time()
+    if not force and now - _last_flush['value'] < METRICS_FLUSH_SECONDS:
+        return
+    _last_flush['value'] = now
+    print(f"CACHE METRICS: {json.dumps(snapshot(), separators=(',', ':'))}", flush=True)
+
+
+def reset():
+    """Drop all collected metrics."""
+    with _metrics_lock:
+        _metrics.clear()
@@ -1,10 +1,166 @@
+import hashlib
+import json
 import os
+import threading
 import yaml
-import markdown
+from utils.markup import markdown_to_html
 from werkzeug.utils import safe_join
 import glob
 from datetime import datetime
 
+# Parsed/rendered documents, keyed by (kind, path) and stamped with the file's
+# mtime and size - each file is rendered once per deploy, not once per request
+_render_cache = {}
+_render_lock = threading.Lock()
+
+def _cached_render(kind, path, build):
+    """Return build(path), memoized until the file at path changes.
+    
+    Args:
+        kind: Namespace for the cached value (the same file may be built differently)
+        path: File to build from
+        build: Callable taking the path and returning the parsed/rendered value
+        
+    Returns:
+        The cached or freshly built value (treat as read-only)
+    """
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    key = (kind, path)
+    
+    with _render_lock:
+        entry = _render_cache.get(key)
+    if entry and entry[0] == stamp:
+        return entry[1]
+    
+    value = build(path)
+    with _render_lock:
+        _render_cache[key] = (stamp, value)
+    return value
+
+def clear_render_cache():
+    """Drop all cached documents (e.g. after content is updated in place)"""
+    with _render_lock:
+        _render_cache.clear()
+        _slug_indexes.clear()
+
+# slug -> file name maps for detail pages, stamped with the directory's mtime
+# (adding, removing or renaming a file changes it) and, where the slug is read
+# from inside the file, each file's mtime and size - a lookup reads one file
+_slug_indexes = {}
+
+def _slug_index(kind, directory, build, stamp_files=False):
+    """Return build(directory), memoized until the directory changes.
+    
+    Args:
+        kind: Namespace for the index
+        directory: Directory the index covers
+        build: Callable taking the directory and returning a slug -> file name dict
+        stamp_files: Also stamp with each file's mtime and size - needed when the
+                     slug is read from inside the file, so an in-place edit that
+                     changes it (leaving the directory mtime alone) is picked up
+        
+    Returns:
+        The slug -> file name dict (treat as read-only)
+    """
+    stamp = os.stat(directory).st_mtime_ns
+    if stamp_files:
+        # One stat per file - still no reads or parsing on a hit
+        files = []
+        with os.scandir(directory) as entries:
+            for e in entries:
+                if e.is_file():
+                    st = e.stat()
+                    files.append((e.name, st.st_mtime_ns, st.st_size))
+        stamp = (stamp, tuple(sorted(files)))
+    with _render_lock:
+        entry = _slug_indexes.get(kind)
+    if entry and entry[0] == stamp:
+        return entry[1]
+    
+    value = build(directory)
+    with _render_lock:
+        _slug_indexes[kind] = (stamp, value)
+    return value
+
+# Build-time artifacts from `python -m utils.prerender` - used when present and
+# still matching their source file, otherwise documents are rendered live
+PRERENDER_DIR = os.path.join(os.path.dirname(__file__), '..', 'prerendered')
+PRERENDER_INDEX = os.path.join(PRERENDER_DIR, 'index.json')
+
+def source_hash(path):
+    """SHA-1 of a source file's bytes (identifies the version an artifact was built from)"""
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+_renderer_fingerprint = None
+
+def renderer_fingerprint():
+    """SHA-1 of everything besides the source that shapes rendered HTML.
+    
+    Covers the sanitizer whitelists, the Markdown extensions and the library
+    versions, so artifacts built under other rules (e.g. before a sanitizer
+    fix) are rejected instead of served until the next build lands.
+    """
+    global _renderer_fingerprint
+    if _renderer_fingerprint is None:
+        import bleach
+        import markdown
+        import pygments
+        from utils.markup import MARKDOWN_EXTENSIONS
+        from utils.security import ALLOWED_TAGS, ALLOWED_ATTRIBUTES
+        
+        rules = {
+            'tags': sorted(ALLOWED_TAGS),
+            'attributes': {tag: sorted(attrs) for tag, attrs in ALLOWED_ATTRIBUTES.items()},
+            'extensions': MARKDOWN_EXTENSIONS,
+            'versions': [bleach.__version__, markdown.__version__, pygments.__version__]
+        }
+        _renderer_fingerprint = hashlib.sha1(json.dumps(rules, sort_keys=True).encode('utf-8')).hexdigest()
+    return _renderer_fingerprint
+
+def _load_prerender_index():
+    """The prerendered index.json, or None if it hasn't been built for the current renderer"""
+    if not os.path.exists(PRERENDER_INDEX):
+        return None
+    try:
+        def load(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        index = _cached_render('prerender_index', PRERENDER_INDEX, load)
+    except Exception as e:
+        print(f"Error loading prerendered index: {e}")
+        return None
+    
+    if index.get('renderer') != renderer_fingerprint():
+        return None
+    return index
+
+def prerendered_entry(section, filename, source_path):
+    """Get the prerendered entry for a source file if it is still current.
+    
+    Args:
+        section: 'issues' or 'special_issues'
+        filename: Source file name within its directory
+        source_path: Path of the source file (hashed to detect stale artifacts)
+        
+    Returns:
+        The entry dict (with 'html' loaded from its fragment, if any), or None
+    """
+    index = _load_prerender_index()
+    if not index:
+        return None
+    entry = index.get(section, {}).get(filename)
+    if not entry or entry.get('source_sha1') != source_hash(source_path):
+        return None
+    
+    entry = dict(entry)
+    if entry.get('html_file'):
+        with open(os.path.join(PRERENDER_DIR, entry['html_file']), 'r', encoding='utf-8') as f:
+            entry['html'] = f.read()
+    return entry
+
 def get_issue(filename):
     """Get issue content and metadata"""
     try:
@@ -14,54 +170,65 @@ def get_issue(filename):
         if not filepath or not os.path.exists(filepath):
             return None, None
         
-        with open(filepath, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # Parse frontmatter
-        if content.startswith('---'):
-            parts = content.split('---', 2)
-            if len(parts) >= 3:
-                frontmatter = yaml.safe_load(parts[1])
-                content = parts[2].strip()
-            else:
-                frontmatter = {}
-                content = content.lstrip('-').strip()
-        else:
-            frontmatter = {}
-            content = content.strip()
-        
-        # Convert markdown to HTML
-        html_content = markdown.markdown(
-            content,
-            extensions=['extra', 'codehilite', 'toc']
-        )
-        
-        # SECURITY: Sanitize the resulting HTML (Centralized logic)
-        from utils.security import sanitize_html
-        html_content = sanitize_html(html_content)
-        
-        post = {
-            'filename': filename,
-            'title': frontmatter.get('title', filename.replace('.md', '')),
-            'date': frontmatter.get('date', datetime.now().strftime('%Y-%m-%d')),
-            'author': frontmatter.get('author', ''),
-            'tags': frontmatter.get('tags', []),
-            'content': content,
-            'frontmatter': frontmatter,
-            'html': html_content
-        }
-        
-        # Flatten frontmatter into post dict
-        for key, value in frontmatter.items():
-            if key not in post:
-                post[key] = value
-        
-        return post, html_content
+        post = dict(_cached_render('issue', filepath, lambda path: _render_issue(path, filename)))
+        return post, post['html']
         
     except Exception as e:
         print(f"Error reading issue {filename}: {e}")
         return None, None
 
+def _render_issue(filepath, filename):
+    """Load one issue from its prerendered artifact, or render it live (uncached)"""
+    entry = prerendered_entry('issues', filename, filepath)
+    if entry:
+        post = dict(entry['post'])
+        post['html'] = entry['html']
+        return post
+    return _render_issue_live(filepath, filename)
+
+def _render_issue_live(filepath, filename):
+    """Parse and render one issue file with Markdown and bleach"""
+    with open(filepath, 'r', encoding='utf-8') as f:
+        content = f.read()
+    
+    # Parse frontmatter
+    if content.startswith('---'):
+        parts = content.split('---', 2)
+        if len(parts) >= 3:
+            frontmatter = yaml.safe_load(parts[1])
+            content = parts[2].strip()
+        else:
+            frontmatter = {}
+            content = content.lstrip('-').strip()
+    else:
+        frontmatter = {}
+        content = content.strip()
+    
+    # Convert markdown to HTML
+    html_content = markdown_to_html(content)
+    
+    # SECURITY: Sanitize the resulting HTML (Centralized logic)
+    from utils.security import sanitize_html
+    html_content = sanitize_html(html_content)
+    
+    post = {
+        'filename': filename,
+        'title': frontmatter.get('title', filename.replace('.md', '')),
+        'date': frontmatter.get('date', datetime.now().strftime('%Y-%m-%d')),
+        'author': frontmatter.get('author', ''),
+        'tags': frontmatter.get('tags', []),
+        'content': content,
+        'frontmatter': frontmatter,
+        'html': html_content
+    }
+    
+    # Flatten frontmatter into post dict
+    for key, value in frontmatter.items():
+        if key not in post:
+            post[key] = value
+    
+    return post
+
 def get_all_issues():
     """Get all issues from the issues directory"""
     try:
@@ -83,41 +250,100 @@ def get_all_issues():
         print(f"Error getting issues: {e}")
         return []
 
+ISSUE_SNIPPET_CHARS = 1000  # Body text kept per issue in listings
+
+def _read_issue_summary(filepath, snippet_chars):
+    """Read an issue's frontmatter and the start of its body - no Markdown or bleach (uncached)"""
+    filename = os.path.basename(filepath)
+    with open(filepath, 'r', encoding='utf-8') as f:
+        first = f.readline()
+        frontmatter = {}
+        if first.startswith('---'):
+            # Stop reading at the closing fence, then take only the snippet
+            fm_lines = []
+            for line in f:
+                if line.startswith('---'):
+                    break
+                fm_lines.append(line)
+            frontmatter = yaml.safe_load(''.join(fm_lines)) or {}
+            snippet = f.read(snippet_chars)
+        else:
+            snippet = first + f.read(snippet_chars)
+    
+    summary = {
+        'filename': filename,
+        'title': frontmatter.get('title', filename.replace('.md', '')),
+        'date': frontmatter.get('date', datetime.now().strftime('%Y-%m-%d')),
+        'author': frontmatter.get('author', ''),
+        'tags': frontmatter.get('tags', []),
+        'content': snippet.strip()[:snippet_chars],
+        'frontmatter': frontmatter
+    }
+    
+    # Flatten frontmatter into summary dict
+    for key, value in frontmatter.items():
+        if key not in summary:
+            summary[key] = value
+    
+    return summary
+
+def list_issues(snippet_chars=ISSUE_SNIPPET_CHARS):
+    """List issues with metadata and a body snippet only.
+    
+    Reads just the frontmatter and the first snippet_chars of each body, so
+    listings never pay for Markdown rendering or sanitizing - use get_issue()
+    when a single issue is opened.
+    
+    Args:
+        snippet_chars: Characters of body text to include as 'content'
+        
+    Returns:
+        List of issue summary dicts (no 'html'), newest first
+    """
+    try:
+        issues_dir = os.path.join(os.path.dirname(__file__), '..', 'issues')
+        if not os.path.exists(issues_dir):
+            return []
+        
+        issues = []
+        for filepath in glob.glob(os.path.join(issues_dir, '*.md')):
+            try:
+                summary = _cached_render(f'issue_summary:{snippet_chars}', filepath,
+                                         lambda path: _read_issue_summary(path, snippet_chars))
+                issues.append(dict(summary))
+            except Exception as e:
+                print(f"Error reading issue {os.path.basename(filepath)}: {e}")
+        
+        issues.sort(key=lambda x: x.get('filename', ''), reverse=True)
+        return issues
+        
+    except Exception as e:
+        print(f"Error listing issues: {e}")
+        return []
+
+SPECIAL_ISSUES_DIR = os.path.join(os.path.dirname(__file__), '..', 'special_issues')
+
+def _build_special_issue_slugs(special_dir):
+    """Map each special issue's slug (its file name without .md) to the file (uncached)"""
+    return {f[:-len('.md')]: f for f in sorted(os.listdir(special_dir)) if f.endswith('.md')}
+
 def get_special_issue(slug):
     """Get a special issue by slug"""
     try:
-        special_dir = os.path.join(os.path.dirname(__file__), '..', 'special_issues')
-        # Try finding markdown file with slug pattern
-        md_file = None
-        for f in os.listdir(special_dir):
-            if f.endswith('.md') and slug in f:
-                md_file = f
-                break
+        if not os.path.exists(SPECIAL_ISSUES_DIR):
+            return None
         
+        slugs = _slug_index('special_issues', SPECIAL_ISSUES_DIR, _build_special_issue_slugs)
+        md_file = slugs.get(slug)
         if not md_file:
-            return None
+            # Older links used part of the file name (e.g. 'threshold-guardians')
+            md_file = next((f for f in slugs.values() if slug in f), None)
         
-        md_path = os.path.join(special_dir, md_file)
-        with open(md_path, 'r', encoding='utf-8') as f:
-            md_content = f.read()
-        
-        # Parse frontmatter
-        if md_content.startswith('---'):
-            parts = md_content.split('---', 2)
-            if len(parts) >= 3:
-                frontmatter = yaml.safe_load(parts[1])
-                body = parts[2].strip()
-            else:
-                frontmatter = {}
-                body = md_content
-        else:
-            frontmatter = {}
-            body = md_content
+        if not md_file:
+            return None
         
-        # Convert markdown to HTML
-        html_content = markdown.markdown(body, extensions=['extra', 'codehilite', 'toc'])
-        from utils.security import sanitize_html
-        html_content = sanitize_html(html_content)
+        md_path = os.path.join(SPECIAL_ISSUES_DIR, md_file)
+        frontmatter, body, html_content = _cached_render('special_issue', md_path, _render_special_issue)
         
         # Get cover from frontmatter
         cover = frontmatter.get('cover', '')
@@ -141,10 +367,81 @@ def get_special_issue(slug):
         print(f"Error getting special issue {slug}: {e}")
         return None
 
+def _render_special_issue(md_path):
+    """Load one special issue from its prerendered artifact, or render it live (uncached)"""
+    entry = prerendered_entry('special_issues', os.path.basename(md_path), md_path)
+    if entry:
+        return entry['frontmatter'], entry['body'], entry['html']
+    return _render_special_issue_live(md_path)
+
+def _render_special_issue_live(md_path):
+    """Parse and render one special issue file with Markdown and bleach"""
+    with open(md_path, 'r', encoding='utf-8') as f:
+        md_content = f.read()
+    
+    # Parse frontmatter
+    if md_content.startswith('---'):
+        parts = md_content.split('---', 2)
+        if len(parts) >= 3:
+            frontmatter = yaml.safe_load(parts[1])
+            body = parts[2].strip()
+        else:
+            frontmatter = {}
+            body = md_content
+    else:
+        frontmatter = {}
+        body = md_content
+    
+    # Convert markdown to HTML
+    html_content = markdown_to_html(body)
+    from utils.security import sanitize_html
+    html_content = sanitize_html(html_content)
+    
+    return frontmatter, body, html_content
+
+def _read_special_issue_summary(md_path):
+    """Parse one special issue's frontmatter into a listing entry (uncached)"""
+    f = os.path.basename(md_path)
+    with open(md_path, 'r', encoding='utf-8') as mf:
+        md_content = mf.read()
+    
+    # Parse frontmatter
+    title = f.replace('.md', '').replace('-', ' ').title()
+    description = ''
+    cover = ''
+    date = ''
+    issue_num = ''
+    season = ''
+    slug = f.replace('.md', '')
+    
+    if md_content.startswith('---'):
+        parts = md_content.split('---', 2)
+        if len(parts) >= 2:
+            frontmatter = yaml.safe_load(parts[1])
+            title = frontmatter.get('title', title)
+            description = frontmatter.get('subtitle', '')
+            cover = frontmatter.get('cover', '')
+            date = frontmatter.get('date', '')
+            issue_num = frontmatter.get('issue', '')
+            season = frontmatter.get('season', '')
+            # Generate slug from filename
+            slug = f.replace('.md', '')
+    
+    return {
+        'slug': slug,
+        'title': title,
+        'description': description,
+        'cover': cover,
+        'date': date,
+        'issue': issue_num,
+        'season': season,
+        'filename': f
+    }
+
 def get_all_special_issues():
     """Get all special issues from the special_issues directory"""
     try:
-        special_dir = os.path.join(os.path.dirname(__file__), '..', 'special_issues')
+        special_dir = SPECIAL_ISSUES_DIR
         if not os.path.exists(special_dir):
             return []
         
@@ -152,41 +449,7 @@ def get_all_special_issues():
         for f in os.listdir(special_dir):
             if f.endswith('.md'):
                 md_path = os.path.join(special_dir, f)
-                with open(md_path, 'r', encoding='utf-8') as mf:
-                    md_content = mf.read()
-                
-                # Parse frontmatter
-                title = f.replace('.md', '').replace('-', ' ').title()
-                description = ''
-                cover = ''
-                date = ''
-                issue_num = ''
-                season = ''
-                slug = f.replace('.md', '')
-                
-                if md_content.startswith('---'):
-                    parts = md_content.split('---', 2)
-                    if len(parts) >= 2:
-                        frontmatter = yaml.safe_load(parts[1])
-                        title = frontmatter.get('title', title)
-                        description = frontmatter.get('subtitle', '')
-                        cover = frontmatter.get('cover', '')
-                        date = frontmatter.get('date', '')
-                        issue_num = frontmatter.get('issue', '')
-                        season = frontmatter.get('season', '')
-                        # Generate slug from filename
-                        slug = f.replace('.md', '')
-                
-                special_issues.append({
-                    'slug': slug,
-                    'title': title,
-                    'description': description,
-                    'cover': cover,
-                    'date': date,
-                    'issue': issue_num,
-                    'season': season,
-                    'filename': f
-                })
+                special_issues.append(dict(_cached_render('special_summary', md_path, _read_special_issue_summary)))
         
         special_issues.sort(key=lambda x: x.get('filename', ''), reverse=True)
         return special_issues
@@ -194,3 +457,43 @@ def get_all_special_issues():
     except Exception as e:
         print(f"Error getting special issues: {e}")
         return []
+
+BLOG_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'blog'))
+
+def _read_blog_post(filepath):
+    """Parse one blog post JSON file (uncached)"""
+    with open(filepath, 'r') as f:
+        return json.load(f)
+
+def load_blog_post(filepath):
+    """Load one blog post JSON file, parsed once until the file changes"""
+    return dict(_cached_render('blog', filepath, _read_blog_post))
+
+def _build_blog_slugs(blog_dir):
+    """Map each blog post's slug to its JSON file (uncached - reads every post once)"""
+    slugs = {}
+    for filename in sorted(os.listdir(blog_dir)):
+        if filename.endswith('.json'):
+            try:
+                post = load_blog_post(os.path.join(blog_dir, filename))
+                slugs.setdefault(post.get('slug'), filename)
+            except Exception as e:
+                print(f"Error indexing blog post {filename}: {e}")
+    return slugs
+
+def get_blog_post(slug):
+    """Get a single blog post by slug, reading only its own file"""
+    try:
+        if not os.path.exists(BLOG_DIR):
+            return None
+        
+        # Slugs live inside the files, so the index is stamped per file too
+        slugs = _slug_index('blog', BLOG_DIR, _build_blog_slugs, stamp_files=True)
+        filename = slugs.get(slug)
+        if not filename:
+            return None
+        return load_blog_post(os.path.join(BLOG_DIR, filename))
+        
+    except Exception as e:
+        print(f"Error getting blog post {slug}: {e}")
+        return None
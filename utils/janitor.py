@@ -0,0 +1,123 @@
+"""
+Expired-row janitor for the TTL tables.
+
+cache_entries (including 'lease:' rows) and rate_limits only ever grow on
+their own - expired rows are ignored by readers but never removed. The janitor
+deletes them in bounded batches so a large backlog never turns into one long
+statement. Cache rows are kept until they are MAX_STALE_SECONDS past expiry,
+since stale-while-revalidate readers still serve them until then:
+
+    python -m utils.janitor
+    python -m utils.janitor --batch-size 200 --max-batches 5
+
+Also exposed as POST /api/admin/janitor and run daily by
+.github/workflows/janitor.yml.
+"""
+import time
+from datetime import datetime, timezone
+from utils.cache import clean_expired_cache
+
+JANITOR_BATCH_SIZE = 500  # Rows deleted per statement
+JANITOR_MAX_BATCHES = 20  # Per table per run - the next run picks up the rest
+
+
+def _clean_rate_limits(limit: int):
+    """
+    Delete up to limit rate_limits rows whose window has ended.
+
+    Returns:
+        Number of rows removed, or -1 on error
+    """
+    from app import supabase
+
+    if not supabase:
+        return -1
+
+    try:
+        now = datetime.now(timezone.utc).isoformat()
+        # PostgREST deletes have no LIMIT - select a bounded batch of keys first
+        batch = supabase.table('rate_limits').select('key').lt('reset_time', now).limit(limit).execute()
+        keys = [row['key'] for row in (batch.data or [])]
+        if not keys:
+            return 0
+        result = supabase.table('rate_limits').delete().in_('key', keys).lt('reset_time', now).execute()
+        return len(result.data) if result.data else 0
+    except Exception as e:
+        print(f"JANITOR ERROR (rate_limits): {e}")
+        return -1
+
+
+# Table name -> callable(limit) returning rows removed (-1 on error)
+CLEANERS = {
+    'cache_entries': clean_expired_cache,
+    'rate_limits': _clean_rate_limits,
+}
+
+
+def run_janitor(batch_size: int = JANITOR_BATCH_SIZE, max_batches: int = JANITOR_MAX_BATCHES):
+    """
+    Delete expired rows from every TTL table in bounded batches.
+
+    Args:
+        batch_size: Rows deleted per statement
+        max_batches: Upper bound on statements per table for this run
+
+    Returns:
+        Dict of table -> {'removed': int, 'batches': int, 'seconds': float, 'complete': bool}
+        ('error': True if a batch failed)
+    """
+    report = {}
+
+    for table, clean in CLEANERS.items():
+        start = time.time()
+        removed = 0
+        batches = 0
+        complete = False
+        error = False
+
+        while batches < max_batches:
+            count = clean(batch_size)
+            batches += 1
+            if count < 0:
+                error = True
+                break
+            removed += count
+            if count < batch_size:
+                complete = True
+                break
+
+        report[table] = {
+            'removed': removed,
+            'batches': batches,
+            'seconds': round(time.time() - start, 3),
+            'complete': complete
+        }
+        if error:
+            report[table]['error'] = True
+
+    print(f"JANITOR: {report}", flush=True)
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description='The Scroll: Expired-Row Janitor')
+    parser.add_argument('--batch-size', type=int, default=JANITOR_BATCH_SIZE, help='Rows deleted per statement')
+    parser.add_argument('--max-batches', type=int, default=JANITOR_MAX_BATCHES, help='Maximum statements per table')
+    args = parser.parse_args()
+
+    # Load .env for local testing if present
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    from app import init_supabase
+    init_supabase()
+
+    report = run_janitor(args.batch_size, args.max_batches)
+    for table, result in report.items():
+        status = 'ERROR' if result.get('error') else ('done' if result['complete'] else 'more remaining')
+        print(f"{table}: removed {result['removed']} rows in {result['batches']} batches ({status})")
+
+    sys.exit(1 if any(r.get('error') for r in report.values()) else 0)
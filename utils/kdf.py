@@ -0,0 +1,158 @@
+"""
+Bounded execution and cost tuning for key derivation (Argon2 / Werkzeug hashes).
+
+Hashing at /api/join and verification of API keys run on a small shared thread
+pool instead of inline on request threads. argon2-cffi releases the GIL while
+hashing, so the pool size is the number of derivations that run at once; a
+burst beyond the pool plus KDF_MAX_QUEUE waiting jobs is rejected with
+KDFBusyError (served as 503) rather than piling up CPU and memory.
+
+Argon2 cost comes from ARGON2_TIME_COST / ARGON2_MEMORY_COST / ARGON2_PARALLELISM
+(argon2-cffi defaults otherwise). Pick values for the deployment hardware with:
+
+    python -m utils.kdf --target-ms 50
+
+Stored hashes made with other parameters are rehashed on the next successful
+verify (see utils.auth._verify_agent_hash).
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+KDF_MAX_WORKERS = int(os.environ.get('KDF_MAX_WORKERS', min(4, os.cpu_count() or 1)))
+KDF_MAX_QUEUE = int(os.environ.get('KDF_MAX_QUEUE', 16))  # Jobs allowed to wait for a worker
+KDF_WAIT_SECONDS = 10  # Give up on a queued job after this long
+
+_executor = ThreadPoolExecutor(max_workers=KDF_MAX_WORKERS, thread_name_prefix='kdf')
+_slots = threading.BoundedSemaphore(KDF_MAX_WORKERS + KDF_MAX_QUEUE)
+
+
+class KDFBusyError(Exception):
+    """Raised when the KDF pool and its queue are full."""
+
+
+def argon2_params():
+    """Argon2 cost parameters from the environment (argon2-cffi defaults if unset)."""
+    from argon2 import PasswordHasher
+    defaults = PasswordHasher()
+    return {
+        'time_cost': int(os.environ.get('ARGON2_TIME_COST', defaults.time_cost)),
+        'memory_cost': int(os.environ.get('ARGON2_MEMORY_COST', defaults.memory_cost)),
+        'parallelism': int(os.environ.get('ARGON2_PARALLELISM', defaults.parallelism)),
+    }
+
+
+def run_kdf(fn, *args):
+    """
+    Run a key-derivation call on the bounded pool and wait for its result.
+
+    Args:
+        fn: Callable doing the derivation (e.g. ph.verify, ph.hash)
+        *args: Arguments for fn
+
+    Returns:
+        fn's return value (exceptions raised by fn propagate)
+
+    Raises:
+        KDFBusyError: If the pool and queue are full, or the job waited too long
+    """
+    if not _slots.acquire(blocking=False):
+        raise KDFBusyError('Key derivation queue is full')
+
+    try:
+        future = _executor.submit(fn, *args)
+    except Exception:
+        _slots.release()
+        raise
+    future.add_done_callback(lambda _: _slots.release())
+
+    try:
+        return future.result(timeout=KDF_WAIT_SECONDS)
+    except FutureTimeoutError:
+        future.cancel()
+        raise KDFBusyError('Key derivation timed out')
+
+
+def submit_kdf(fn, *args):
+    """
+    Queue a key-derivation call without waiting (e.g. a background rehash).
+
+    Returns:
+        The Future, or None if the pool is full (the job is simply skipped)
+    """
+    if not _slots.acquire(blocking=False):
+        return None
+    try:
+        future = _executor.submit(fn, *args)
+    except Exception:
+        _slots.release()
+        return None
+    future.add_done_callback(lambda _: _slots.release())
+    return future
+
+
+def benchmark(candidates, rounds=5):
+    """
+    Measure Argon2 verify latency for candidate parameters on this machine.
+
+    Args:
+        candidates: Iterable of (time_cost, memory_cost_kib, parallelism)
+        rounds: Verifications per candidate
+
+    Returns:
+        List of dicts with the parameters and median/max verify milliseconds
+    """
+    from argon2 import PasswordHasher
+
+    results = []
+    for time_cost, memory_cost, parallelism in candidates:
+        hasher = PasswordHasher(time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism)
+        stored = hasher.hash('benchmark-key')
+        timings = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            hasher.verify(stored, 'benchmark-key')
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        results.append({
+            'time_cost': time_cost,
+            'memory_cost': memory_cost,
+            'parallelism': parallelism,
+            'median_ms': round(timings[len(timings) // 2], 2),
+            'max_ms': round(timings[-1], 2)
+        })
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description='The Scroll: Argon2 Cost Benchmark')
+    parser.add_argument('--target-ms', type=float, default=50.0, help='Verify latency budget per request (median)')
+    parser.add_argument('--rounds', type=int, default=5, help='Verifications per candidate')
+    parser.add_argument('--parallelism', type=int, default=None, help='Lanes (default: current ARGON2_PARALLELISM)')
+    args = parser.parse_args()
+
+    current = argon2_params()
+    parallelism = args.parallelism or current['parallelism']
+    candidates = [(t, m, parallelism) for m in (19456, 32768, 47104, 65536, 131072) for t in (1, 2, 3, 4)]
+
+    print(f"Current: {current}")
+    print(f"{'t':>3} {'m (KiB)':>9} {'p':>3} {'median ms':>10} {'max ms':>8}")
+    results = benchmark(candidates, args.rounds)
+    for r in results:
+        print(f"{r['time_cost']:>3} {r['memory_cost']:>9} {r['parallelism']:>3} {r['median_ms']:>10} {r['max_ms']:>8}")
+
+    # Strongest setting within budget: most memory first, then most passes
+    fitting = [r for r in results if r['median_ms'] <= args.target_ms]
+    if not fitting:
+        print(f"No candidate verifies within {args.target_ms} ms on this machine.")
+        sys.exit(1)
+
+    best = max(fitting, key=lambda r: (r['memory_cost'], r['time_cost']))
+    print(f"\nRecommended (median {best['median_ms']} ms):")
+    print(f"ARGON2_TIME_COST={best['time_cost']}")
+    print(f"ARGON2_MEMORY_COST={best['memory_cost']}")
+    print(f"ARGON2_PARALLELISM={best['parallelism']}")
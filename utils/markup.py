@@ -0,0 +1,176 @@
+"""
+Reusable Markdown and bleach engines.
+
+markdown.markdown() builds a new Markdown instance - and loads the extra,
+codehilite and toc extensions - on every call, and bleach.clean() builds a new
+Cleaner (html5lib parser, walker, serializer) on every call. For short texts
+like proposal comments and bios that setup costs more than the conversion.
+
+Instead, pre-built instances are kept in small pools and reset between uses.
+Neither class is safe to share between threads, so each call checks out its
+own instance and returns it afterwards. Measure the saving with:
+
+    python -m utils.markup
+
+On top of that, memoized() keeps a bounded LRU of rendered output keyed by a
+hash of the source text, so the template filters render an unchanged comment
+or bio once per instance rather than on every page view.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import markdown
+
+MARKDOWN_EXTENSIONS = ['extra', 'codehilite', 'toc']
+POOL_MAX_IDLE = 8  # Instances kept per pool; extra ones under load are discarded
+MEMO_MAX_ENTRIES = 1024  # Bounded LRU - least recently used output is evicted first
+MEMO_MAX_TEXT_CHARS = 20000  # Longer texts bypass the memo; issues are cached sanitized by utils.content
+
+_memo = OrderedDict()
+_memo_lock = threading.Lock()
+
+
+class ObjectPool:
+    """Thread-safe pool of reusable, non-thread-safe objects."""
+
+    def __init__(self, factory, reset=None, max_idle=POOL_MAX_IDLE):
+        self._factory = factory
+        self._reset = reset
+        self._max_idle = max_idle
+        self._idle = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def get(self):
+        """Check out an instance (building one if none is idle) for one use."""
+        with self._lock:
+            obj = self._idle.pop() if self._idle else None
+        if obj is None:
+            obj = self._factory()
+
+        try:
+            yield obj
+        finally:
+            try:
+                if self._reset:
+                    self._reset(obj)
+            except Exception as e:
+                # Don't hand a half-reset instance to the next caller
+                print(f"[MARKUP] Discarding pooled instance after failed reset: {e}")
+            else:
+                with self._lock:
+                    if len(self._idle) < self._max_idle:
+                        self._idle.append(obj)
+
+
+_markdown_pool = ObjectPool(
+    lambda: markdown.Markdown(extensions=MARKDOWN_EXTENSIONS),
+    reset=lambda md: md.reset()
+)
+
+
+def markdown_to_html(text):
+    """
+    Convert markdown to (unsanitized) HTML with a pooled Markdown instance.
+
+    Same output as markdown.markdown(text, extensions=MARKDOWN_EXTENSIONS);
+    callers still pass the result through utils.security.sanitize_html.
+    """
+    with _markdown_pool.get() as md:
+        return md.convert(text)
+
+
+def memoized(kind, text, render):
+    """
+    Return render(text), memoized by a hash of text.
+
+    Args:
+        kind: Namespace for the output (e.g. 'markdown', 'sanitize')
+        text: Source text; non-strings and very long texts bypass the memo
+        render: Pure function of text (same input always gives same output)
+
+    Returns:
+        The rendered string
+    """
+    if not isinstance(text, str) or len(text) > MEMO_MAX_TEXT_CHARS:
+        return render(text)
+
+    key = (kind, hashlib.sha1(text.encode('utf-8')).hexdigest())
+    with _memo_lock:
+        if key in _memo:
+            _memo.move_to_end(key)
+            return _memo[key]
+
+    # Rendered outside the lock; two threads racing on new text just both render it
+    value = render(text)
+    with _memo_lock:
+        _memo[key] = value
+        _memo.move_to_end(key)
+        while len(_memo) > MEMO_MAX_ENTRIES:
+            _memo.popitem(last=False)
+    return value
+
+
+def clear_memo():
+    """Drop all memoized output (e.g. after changing the sanitizer whitelists)"""
+    with _memo_lock:
+        _memo.clear()
+
+
+def benchmark(text, rounds=1000):
+    """
+    Time per-call construction against the pooled engines.
+
+    Args:
+        text: Markdown source to render
+        rounds: Calls per variant
+
+    Returns:
+        Dict of variant -> microseconds per call
+    """
+    import time
+
+    import bleach
+
+    from utils.security import ALLOWED_TAGS, ALLOWED_ATTRIBUTES, sanitize_html
+
+    def fresh():
+        html = markdown.markdown(text, extensions=MARKDOWN_EXTENSIONS)
+        return bleach.clean(html, tags=ALLOWED_TAGS, attributes=ALLOWED_ATTRIBUTES, strip=True)
+
+    def pooled():
+        return sanitize_html(markdown_to_html(text))
+
+    if fresh() != pooled():
+        raise AssertionError('Pooled engines produced different output')
+
+    results = {}
+    for name, fn in (('per_call', fresh), ('pooled', pooled)):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            fn()
+        results[name] = round((time.perf_counter() - start) / rounds * 1e6, 1)
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='The Scroll: Markdown/Sanitizer Benchmark')
+    parser.add_argument('--rounds', type=int, default=1000, help='Calls per variant')
+    parser.add_argument('--file', help='Markdown file to render (default: a short comment)')
+    args = parser.parse_args()
+
+    if args.file:
+        with open(args.file, 'r', encoding='utf-8') as f:
+            sample = f.read()
+    else:
+        sample = "I **support** this proposal - see [issue 3](/issue/3) and `utils/cache.py`."
+
+    print(f"Rendering {len(sample)} chars x {args.rounds}")
+    timings = benchmark(sample, args.rounds)
+    print(f"per-call construction: {timings['per_call']} us/call")
+    print(f"pooled engines:        {timings['pooled']} us/call")
+    print(f"saving:                {round(timings['per_call'] - timings['pooled'], 1)} us/call")
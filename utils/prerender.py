@@ -0,0 +1,111 @@
+"""
+Build-time pre-rendering of issues and special issues.
+
+Content in issues/ and special_issues/ only changes on commit, so it is
+rendered once here instead of on every cold start:
+
+    python -m utils.prerender
+
+Writes prerendered/index.json plus one sanitized HTML fragment per issue and
+special issue, and the full-text search index (utils/search.py, updated
+incrementally from the previous build). utils/content.py uses an artifact only
+while its recorded source SHA-1 still matches the file on disk, and falls back
+to live rendering otherwise - a stale or missing build is never wrong, just
+slower. The index also records the renderer fingerprint (sanitizer whitelists,
+Markdown extensions, library versions); a build made under other rules is
+ignored entirely. .github/workflows/prerender.yml rebuilds on content changes.
+"""
+import glob
+import json
+import os
+import shutil
+
+from utils.content import (
+    PRERENDER_DIR, PRERENDER_INDEX, source_hash, renderer_fingerprint,
+    _render_issue_live, _render_special_issue_live
+)
+from utils import search
+
+ROOT_DIR = os.path.join(os.path.dirname(__file__), '..')
+INDEX_VERSION = 1
+
+
+def _write_fragment(output_dir, section, filename, html):
+    """Write one HTML fragment and return its path relative to output_dir."""
+    rel_path = f"{section}/{os.path.splitext(filename)[0]}.html"
+    with open(os.path.join(output_dir, rel_path), 'w', encoding='utf-8') as f:
+        f.write(html)
+    return rel_path
+
+
+def build(output_dir=PRERENDER_DIR):
+    """
+    Render all issues and special issues into output_dir.
+
+    Args:
+        output_dir: Destination directory (replaced entirely)
+
+    Returns:
+        Dict of section -> number of documents written
+    """
+    # The search index is updated in place, so read it before the directory is replaced
+    search_index_path = os.path.join(output_dir, os.path.basename(search.SEARCH_INDEX_PATH))
+    previous_search_index = search.load_index(search_index_path)
+    
+    if os.path.exists(output_dir):
+        shutil.rmtree(output_dir)
+    for section in ('issues', 'special_issues'):
+        os.makedirs(os.path.join(output_dir, section))
+
+    # Deterministic output (no timestamps) so unchanged content rebuilds to no diff
+    index = {
+        'version': INDEX_VERSION,
+        'renderer': renderer_fingerprint(),
+        'issues': {},
+        'special_issues': {}
+    }
+
+    for path in sorted(glob.glob(os.path.join(ROOT_DIR, 'issues', '*.md'))):
+        filename = os.path.basename(path)
+        post = _render_issue_live(path, filename)
+        html = post.pop('html')
+        index['issues'][filename] = {
+            'source_sha1': source_hash(path),
+            'html_file': _write_fragment(output_dir, 'issues', filename, html),
+            'post': post
+        }
+
+    for path in sorted(glob.glob(os.path.join(ROOT_DIR, 'special_issues', '*.md'))):
+        filename = os.path.basename(path)
+        frontmatter, body, html = _render_special_issue_live(path)
+        index['special_issues'][filename] = {
+            'source_sha1': source_hash(path),
+            'html_file': _write_fragment(output_dir, 'special_issues', filename, html),
+            'frontmatter': frontmatter,
+            'body': body
+        }
+
+    # Dates from YAML frontmatter are stored as ISO strings
+    index_path = os.path.join(output_dir, os.path.basename(PRERENDER_INDEX))
+    with open(index_path, 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, indent=1, sort_keys=True, default=str)
+
+    search_index, _ = search.update_index(previous_search_index)
+    search.save_index(search_index, search_index_path)
+    
+    counts = {section: len(index[section]) for section in ('issues', 'special_issues')}
+    counts['search'] = len(search_index['docs'])
+    return counts
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='The Scroll: Pre-render Content')
+    parser.add_argument('--output', default=PRERENDER_DIR, help='Output directory (default: prerendered/)')
+    args = parser.parse_args()
+
+    counts = build(args.output)
+    print(f"Pre-rendered {counts['issues']} issues and {counts['special_issues']} special issues "
+          f"into {os.path.normpath(args.output)}")
+    print(f"Search index covers {counts['search']} documents")
@@ -1,59 +1,169 @@
+"""
+Rate limiting for the API blueprints.
+
+Decisions are made in memory with a sliding-window counter (the current fixed
+window plus a weighted share of the previous one), so limiting a request costs
+a dict lookup rather than a database round trip.
+
+Local hits are reconciled with the rate_limits table in periodic batches: each
+sync pushes the hits this instance has counted since the last sync and pulls
+back the window total, which includes hits counted by other instances. The push
+goes through the rate_limit_hit Postgres function, which takes arrays of keys,
+hits and window ends and increments and returns all of them in one atomic
+statement - a sync is one round trip per RATE_LIMIT_SYNC_BATCH keys.
+"""
+import threading
+import time
 from functools import wraps
 from flask import request, jsonify
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timezone
+
+RATE_LIMIT_SYNC_SECONDS = 10  # How often local counts are reconciled with Supabase
+RATE_LIMIT_MAX_KEYS = 10000  # Idle keys are pruned past this many tracked keys
+RATE_LIMIT_SYNC_BATCH = 1000  # Keys pushed per rate_limit_hit call
+
+_windows = {}
+_windows_lock = threading.Lock()
+_sync_state = {'last': time.time(), 'running': False}
+
+
+def _client_ip():
+    """Get the client IP, accounting for Vercel proxies."""
+    ip = request.headers.get('X-Forwarded-For', request.remote_addr)
+    if ip:
+        return ip.split(',')[0].strip()
+    return 'unknown'
+
+
+def _hit(key: str, limit: int, per: int, now: float):
+    """
+    Count a request against key if it fits in the sliding window.
+
+    Returns:
+        True if the request is allowed (and was counted), False if over the limit
+    """
+    window_start = (now // per) * per
+
+    with _windows_lock:
+        w = _windows.get(key)
+        if w is None or w['window_start'] < window_start - per:
+            # New key, or idle for more than a full window - nothing to carry over
+            w = {'window_start': window_start, 'per': per, 'count': 0, 'previous': 0, 'pending': 0}
+            _windows[key] = w
+        elif w['window_start'] < window_start:
+            # Rolled into the next window - the old count weights the new one
+            w['previous'] = w['count']
+            w['count'] = 0
+            w['pending'] = 0
+            w['window_start'] = window_start
+
+        elapsed = (now - window_start) / per
+        estimate = w['previous'] * (1 - elapsed) + w['count']
+        if estimate + 1 > limit:
+            return False
+
+        w['count'] += 1
+        w['pending'] += 1
+        return True
+
+
+def _sync():
+    """Push pending local hits to Supabase and adopt the cross-instance totals."""
+    from app import supabase
+
+    try:
+        with _windows_lock:
+            batch = {key: (w['window_start'], w['per'], w['pending'])
+                     for key, w in _windows.items() if w['pending']}
+
+        if not supabase:
+            # Nothing to push to - limits are purely local, so drop the backlog
+            with _windows_lock:
+                for w in _windows.values():
+                    w['pending'] = 0
+            batch = {}
+
+        items = list(batch.items())
+        for i in range(0, len(items), RATE_LIMIT_SYNC_BATCH):
+            chunk = items[i:i + RATE_LIMIT_SYNC_BATCH]
+            try:
+                # Increment-and-read every key in one statement (see rate_limit_hit in db_schema.sql)
+                res = supabase.rpc('rate_limit_hit', {
+                    'p_keys': [key for key, _ in chunk],
+                    'p_hits': [pending for _, (_, _, pending) in chunk],
+                    'p_reset_times': [datetime.fromtimestamp(window_start + per, timezone.utc).isoformat()
+                                      for _, (window_start, per, _) in chunk]
+                }).execute()
+            except Exception as e:
+                # Hits stay pending and go out with the next sync
+                print(f"Rate limit sync error ({len(chunk)} keys): {e}")
+                continue
+            totals = {row['key']: row['hits'] for row in (res.data or [])}
+
+            with _windows_lock:
+                for key, (window_start, per, pending) in chunk:
+                    w = _windows.get(key)
+                    if w is None or w['window_start'] != window_start:
+                        continue
+                    # Hits counted while the call was in flight are still pending
+                    w['pending'] -= pending
+                    w['count'] = max(w['count'], totals.get(key, pending) + w['pending'])
+
+        _prune(time.time())
+    except Exception as e:
+        print(f"Rate limit sync error: {e}")
+    finally:
+        _sync_state['running'] = False
+
+
+def _prune(now: float):
+    """Drop keys whose window ended more than a window ago once the table gets large.
+
+    Such a key no longer weighs into its sliding-window estimate, and any hits
+    still pending for it would be discarded by _hit on the next request anyway
+    (e.g. while rate_limit_hit keeps failing), so pending doesn't keep it alive.
+    """
+    with _windows_lock:
+        if len(_windows) <= RATE_LIMIT_MAX_KEYS:
+            return
+        idle = [key for key, w in _windows.items()
+                if w['window_start'] + 2 * w['per'] < now]
+        for key in idle:
+            del _windows[key]
+
+
+def _maybe_sync(now: float):
+    """Start a background sync if the interval has passed and none is running."""
+    with _windows_lock:
+        if _sync_state['running'] or now - _sync_state['last'] < RATE_LIMIT_SYNC_SECONDS:
+            return
+        _sync_state['running'] = True
+        _sync_state['last'] = now
+    threading.Thread(target=_sync, daemon=True).start()
+
 
 def rate_limit(limit, per=3600):
     """
-    Custom rate limiter backed by Supabase.
+    Sliding-window rate limiter, decided in memory and synced to Supabase in batches.
     limit: max requests
     per: time window in seconds (default 1 hour)
     """
     def decorator(f):
         @wraps(f)
         def wrapped(*args, **kwargs):
-            from app import supabase
-            if not supabase:
-                return f(*args, **kwargs) # Fail open if no DB
-            
-            # Get IP, accounting for Vercel proxies
-            ip = request.headers.get('X-Forwarded-For', request.remote_addr)
-            if ip:
-                ip = ip.split(',')[0].strip()
-            else:
-                ip = 'unknown'
-                
-            key = f"{ip}:{request.endpoint}"
-            now = datetime.now(timezone.utc)
-            
+            key = f"{_client_ip()}:{request.endpoint}"
+            now = time.time()
+
             try:
-                # Upsert approach but Supabase Python client doesn't have native upsert without unique constraints setup.
-                # So we do a select/insert/update logic.
-                res = supabase.table('rate_limits').select('*').eq('key', key).execute()
-                
-                if res.data:
-                    record = res.data[0]
-                    reset_time = datetime.fromisoformat(record['reset_time'].replace('Z', '+00:00'))
-                    
-                    if now > reset_time:
-                        # Window expired, reset
-                        new_reset = (now + timedelta(seconds=per)).isoformat()
-                        supabase.table('rate_limits').update({'hits': 1, 'reset_time': new_reset}).eq('key', key).execute()
-                    else:
-                        # Inside window
-                        hits = record['hits'] + 1
-                        if hits > limit:
-                            # Block request
-                            return jsonify({'error': f'Rate limit exceeded. Limit is {limit} per {per}s.'}), 429
-                        # Allow and increment
-                        supabase.table('rate_limits').update({'hits': hits}).eq('key', key).execute()
-                else:
-                    # New record
-                    new_reset = (now + timedelta(seconds=per)).isoformat()
-                    supabase.table('rate_limits').insert({'key': key, 'hits': 1, 'reset_time': new_reset}).execute()
+                allowed = _hit(key, limit, per, now)
+                _maybe_sync(now)
             except Exception as e:
                 print(f"Rate limit error: {e}")
-                pass # Fail open on DB errors
-                
+                allowed = True  # Fail open on limiter errors
+
+            if not allowed:
+                return jsonify({'error': f'Rate limit exceeded. Limit is {limit} per {per}s.'}), 429
+
             return f(*args, **kwargs)
         return wrapped
     return decorator
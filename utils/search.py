@@ -0,0 +1,396 @@
+"""
+Full-text search over the archive: issues, special issues, blog posts and
+submissions/ markdown.
+
+An inverted index (term -> [doc, term frequency, ...]) is persisted next to the
+pre-rendered content as prerendered/search_index.json and rebuilt incrementally:
+only files whose SHA-1 differs from the one recorded in the index are re-read
+and re-tokenized. At runtime the index is refreshed at most every
+SEARCH_REFRESH_SECONDS (files are only re-hashed when their mtime or size
+changed), so a stale or missing build is never wrong, just slower once.
+
+Results are ranked with BM25. Snippets are cut from the matching documents at
+query time, so the persisted file holds no document text.
+
+    python -m utils.search --build          # (re)build the index file
+    python -m utils.search "ubuntu myth"    # query from the command line
+"""
+import glob
+import html
+import json
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter
+
+import yaml
+
+from utils.content import PRERENDER_DIR, source_hash, _cached_render
+
+ROOT_DIR = os.path.join(os.path.dirname(__file__), '..')
+SEARCH_INDEX_PATH = os.path.join(PRERENDER_DIR, 'search_index.json')
+INDEX_VERSION = 1
+
+# (section, directory, glob) - sections double as the `type` filter of /api/search
+SOURCES = (
+    ('issue', 'issues', '*.md'),
+    ('special_issue', 'special_issues', '*.md'),
+    ('blog', 'blog', '*.json'),
+    ('submission', 'submissions', '**/*.md'),
+)
+SECTIONS = tuple(section for section, _, _ in SOURCES)
+
+SEARCH_REFRESH_SECONDS = 60  # How often a running instance looks for changed files
+SEARCH_MAX_PER_PAGE = 50
+SNIPPET_CHARS = 240
+TITLE_BOOST = 3  # Title terms count this many times towards term frequency
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+STOPWORDS = frozenset("""
+a an and are as at be but by for from has have in into is it its of on or that
+the their there this to was were will with
+""".split())
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+_HEADING_RE = re.compile(r'^#\s+(.+)$', re.MULTILINE)
+_MARKUP_RES = (
+    (re.compile(r'!\[([^\]]*)\]\([^)]*\)'), r'\1'),  # images -> alt text
+    (re.compile(r'\[([^\]]*)\]\([^)]*\)'), r'\1'),   # links -> link text
+    (re.compile(r'<[^>]+>'), ' '),                   # inline HTML
+    (re.compile(r'[#*_`>|~]+'), ' '),                # emphasis, headings, tables
+    (re.compile(r'\s+'), ' '),
+)
+
+_index = None
+_index_lock = threading.Lock()
+_checked_at = 0.0
+
+
+def _tokenize(text):
+    """Lowercased word tokens without stopwords or single characters"""
+    return [t for t in _TOKEN_RE.findall(text.lower()) if len(t) > 1 and t not in STOPWORDS]
+
+
+def _plain_text(markup):
+    """Strip markdown/HTML markup down to readable text"""
+    text = markup
+    for pattern, repl in _MARKUP_RES:
+        text = pattern.sub(repl, text)
+    return html.unescape(text).strip()
+
+
+def _split_frontmatter(content):
+    """Return (frontmatter dict, body) for a markdown file"""
+    if content.startswith('---'):
+        parts = content.split('---', 2)
+        if len(parts) >= 3:
+            try:
+                return yaml.safe_load(parts[1]) or {}, parts[2]
+            except yaml.YAMLError:
+                return {}, parts[2]
+    return {}, content
+
+
+def _extract(section, path):
+    """
+    Read one source file into search metadata and plain text (uncached).
+
+    Returns:
+        (meta dict, title, plain body text)
+    """
+    rel_path = os.path.relpath(path, ROOT_DIR).replace(os.sep, '/')
+    filename = os.path.basename(path)
+    stem = os.path.splitext(filename)[0]
+
+    with open(path, 'r', encoding='utf-8') as f:
+        content = f.read()
+
+    if section == 'blog':
+        post = json.loads(content)
+        title = post.get('title', stem)
+        body = ' '.join(filter(None, [post.get('excerpt', ''), post.get('content', '')]))
+        meta = {'author': post.get('author', ''), 'date': post.get('date', ''),
+                'url': f"/blog/{post.get('slug', stem)}"}
+    else:
+        frontmatter, body = _split_frontmatter(content)
+        heading = _HEADING_RE.search(body)
+        title = frontmatter.get('title') or (heading.group(1).strip() if heading else
+                                             re.sub(r'^\d+_', '', stem).replace('_', ' ').title())
+        meta = {'author': frontmatter.get('author') or frontmatter.get('editor') or '',
+                'date': frontmatter.get('date', '')}
+        if section == 'issue':
+            meta['url'] = f"/issue/{filename}"
+        elif section == 'special_issue':
+            meta['url'] = f"/special-issue/{stem}"
+        else:
+            meta['url'] = None  # Submissions have no page of their own (see _result_url)
+
+    meta.update({'path': rel_path, 'section': section, 'title': str(title)})
+    meta['date'] = str(meta['date'])  # YAML dates -> ISO strings
+    return meta, str(title), _plain_text(body)
+
+
+def _scan():
+    """All indexable files as (section, rel_path, abs_path), sorted by path"""
+    files = []
+    for section, directory, pattern in SOURCES:
+        for path in glob.glob(os.path.join(ROOT_DIR, directory, pattern), recursive=True):
+            rel_path = os.path.relpath(path, ROOT_DIR).replace(os.sep, '/')
+            files.append((section, rel_path, path))
+    files.sort(key=lambda f: f[1])
+    return files
+
+
+def load_index(path=SEARCH_INDEX_PATH):
+    """The persisted index, or None if missing, unreadable or an old version"""
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        if index.get('version') != INDEX_VERSION:
+            return None
+        return index
+    except Exception as e:
+        print(f"[SEARCH] Error loading index {path}: {e}")
+        return None
+
+
+def update_index(index=None):
+    """
+    Bring an index up to date with the files on disk.
+
+    Unchanged documents keep their postings; only new or modified files are
+    tokenized, and deleted files are dropped.
+
+    Args:
+        index: Previous index (from load_index or an earlier update), or None
+
+    Returns:
+        (updated index, number of documents added, changed or removed)
+    """
+    index = index or {'version': INDEX_VERSION, 'docs': [], 'postings': {}}
+    old_docs = {doc['path']: (i, doc) for i, doc in enumerate(index['docs'])}
+    stamps = index.get('stamps', {})
+
+    docs, new_stamps, fresh_terms = [], {}, {}
+    remap = {}  # old doc number -> new doc number
+    changed = 0
+    for section, rel_path, path in _scan():
+        stat = os.stat(path)
+        stamp = [stat.st_mtime_ns, stat.st_size]
+        new_stamps[rel_path] = stamp
+        old = old_docs.get(rel_path)
+
+        if old and stamps.get(rel_path) == stamp:
+            sha1 = old[1]['sha1']
+        else:
+            sha1 = source_hash(path)
+
+        if old and old[1]['sha1'] == sha1:
+            remap[old[0]] = len(docs)
+            docs.append(old[1])
+            continue
+
+        try:
+            meta, title, text = _extract(section, path)
+        except Exception as e:
+            print(f"[SEARCH] Skipping {rel_path}: {e}")
+            continue
+        terms = Counter(_tokenize(text))
+        for term in _tokenize(title):
+            terms[term] += TITLE_BOOST
+        meta['sha1'] = sha1
+        meta['length'] = sum(terms.values())
+        fresh_terms[len(docs)] = terms
+        docs.append(meta)
+        changed += 1
+    changed += len(set(old_docs) - {doc['path'] for doc in docs})  # Deleted files
+
+    postings = {}
+    for term, flat in index['postings'].items():
+        kept = [(remap[flat[i]], flat[i + 1]) for i in range(0, len(flat), 2) if flat[i] in remap]
+        if kept:
+            postings[term] = kept
+    for doc_num, terms in fresh_terms.items():
+        for term, tf in terms.items():
+            postings.setdefault(term, []).append((doc_num, tf))
+
+    updated = {
+        'version': INDEX_VERSION,
+        'docs': docs,
+        # Flattened [doc, tf, doc, tf, ...] lists keep the file compact
+        'postings': {term: [n for pair in sorted(entries) for n in pair]
+                     for term, entries in sorted(postings.items())},
+        'stamps': new_stamps
+    }
+    return updated, changed
+
+
+def save_index(index, path=SEARCH_INDEX_PATH):
+    """Write the index compactly and deterministically (mtime stamps are not persisted)"""
+    payload = {k: index[k] for k in ('version', 'docs', 'postings')}
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, ensure_ascii=False, separators=(',', ':'), sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def get_index():
+    """
+    The current index, refreshed from disk at most every SEARCH_REFRESH_SECONDS.
+
+    Changes are written back to SEARCH_INDEX_PATH when the filesystem allows it
+    (on read-only deployments the refreshed index just lives in memory).
+    """
+    global _index, _checked_at
+
+    with _index_lock:
+        if _index is not None and time.time() - _checked_at < SEARCH_REFRESH_SECONDS:
+            return _index
+
+        index = _index if _index is not None else load_index()
+        index, changed = update_index(index)
+        if changed:
+            print(f"[SEARCH] Re-indexed {changed} document(s)")
+            try:
+                save_index(index)
+            except OSError as e:
+                print(f"[SEARCH] Index kept in memory only: {e}")
+        _index = index
+        _checked_at = time.time()
+        return _index
+
+
+def _result_url(doc):
+    """Page URL of a document; submissions link to their file on GitHub"""
+    if doc['url']:
+        return doc['url']
+    repo_name = os.environ.get('REPO_NAME')
+    return f"https://github.com/{repo_name}/blob/main/{doc['path']}" if repo_name else None
+
+
+def _highlight(text, terms):
+    """HTML-escape text and wrap words matching terms in <mark>"""
+    out, last = [], 0
+    for m in _TOKEN_RE.finditer(text):
+        if m.group(0).lower() in terms:
+            out.append(html.escape(text[last:m.start()], quote=False))
+            out.append(f"<mark>{html.escape(m.group(0), quote=False)}</mark>")
+            last = m.end()
+    out.append(html.escape(text[last:], quote=False))
+    return ''.join(out)
+
+
+def _snippet(doc, terms):
+    """A highlighted window of the document around its first matching term"""
+    path = os.path.join(ROOT_DIR, doc['path'])
+    try:
+        _, _, text = _cached_render('search_text', path, lambda p: _extract(doc['section'], p))
+    except Exception:
+        return ''
+
+    start = 0
+    first = next((m.start() for m in _TOKEN_RE.finditer(text) if m.group(0).lower() in terms), 0)
+    # Start and end on word boundaries, with some lead-in before the first match
+    if first > SNIPPET_CHARS // 4:
+        space = text.find(' ', first - SNIPPET_CHARS // 4)
+        start = space + 1 if 0 <= space < first else first
+    end = start + SNIPPET_CHARS
+    if end < len(text):
+        space = text.rfind(' ', start, end)
+        end = space if space > start else end
+
+    snippet = _highlight(text[start:end], terms)
+    return ('… ' if start else '') + snippet + (' …' if end < len(text) else '')
+
+
+def search(query, page=1, per_page=10, section=None):
+    """
+    Rank archive documents against a query with BM25.
+
+    Args:
+        query: Free-text query (any matching term counts, more matches rank higher)
+        page: 1-based page number
+        per_page: Results per page (capped at SEARCH_MAX_PER_PAGE)
+        section: Optional filter, one of SECTIONS
+
+    Returns:
+        Dict with query, total, page, per_page and results (title, section, url,
+        author, date, score and an HTML snippet with matches in <mark>)
+    """
+    page = max(1, page)
+    per_page = max(1, min(per_page, SEARCH_MAX_PER_PAGE))
+    terms = set(_tokenize(query))
+    response = {'query': query, 'total': 0, 'page': page, 'per_page': per_page, 'results': []}
+    if not terms:
+        return response
+
+    index = get_index()
+    docs = index['docs']
+    if not docs:
+        return response
+    avg_length = sum(d['length'] for d in docs) / len(docs) or 1.0
+
+    scores = {}
+    for term in terms:
+        flat = index['postings'].get(term)
+        if not flat:
+            continue
+        df = len(flat) // 2
+        idf = math.log(1 + (len(docs) - df + 0.5) / (df + 0.5))
+        for i in range(0, len(flat), 2):
+            doc_num, tf = flat[i], flat[i + 1]
+            doc = docs[doc_num]
+            if section and doc['section'] != section:
+                continue
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * doc['length'] / avg_length)
+            scores[doc_num] = scores.get(doc_num, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+    ranked = sorted(scores.items(), key=lambda item: (-item[1], docs[item[0]]['path']))
+    response['total'] = len(ranked)
+
+    for doc_num, score in ranked[(page - 1) * per_page:page * per_page]:
+        doc = docs[doc_num]
+        response['results'].append({
+            'title': doc['title'],
+            'section': doc['section'],
+            'url': _result_url(doc),
+            'path': doc['path'],
+            'author': doc['author'],
+            'date': doc['date'],
+            'score': round(score, 4),
+            'snippet': _snippet(doc, terms)
+        })
+    return response
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='The Scroll: Archive Search')
+    parser.add_argument('query', nargs='?', help='Query to run against the index')
+    parser.add_argument('--build', action='store_true', help='Update the index file incrementally')
+    parser.add_argument('--rebuild', action='store_true', help='Rebuild the index file from scratch')
+    parser.add_argument('--type', choices=SECTIONS, help='Only return one kind of document')
+    parser.add_argument('--page', type=int, default=1)
+    args = parser.parse_args()
+
+    if args.build or args.rebuild:
+        os.makedirs(PRERENDER_DIR, exist_ok=True)
+        index, changed = update_index(None if args.rebuild else load_index())
+        save_index(index)
+        print(f"Indexed {len(index['docs'])} documents ({changed} updated, "
+              f"{len(index['postings'])} terms) into {os.path.normpath(SEARCH_INDEX_PATH)}")
+
+    if args.query:
+        results = search(args.query, page=args.page, section=args.type)
+        print(f"{results['total']} result(s) for {args.query!r}")
+        for r in results['results']:
+            print(f"{r['score']:>8} [{r['section']}] {r['title']} ({r['path']})")
+            print(f"         {r['snippet']}")
+    elif not (args.build or args.rebuild):
+        parser.print_help()
@@ -1,4 +1,7 @@
 import bleach
+from bleach.sanitizer import Cleaner
+
+from utils.markup import ObjectPool
 
 # Define global whitelists for sanitization
 ALLOWED_TAGS = [
@@ -15,19 +18,35 @@ ALLOWED_ATTRIBUTES = {
     '*': ['id']
 }
 
+BIO_TAGS = ['p', 'br', 'strong', 'em', 'ul', 'li', 'ol']
+
+# Pre-built cleaners (see utils/markup.py). Cleaner.clean() resets its own
+# parser state, but an instance must not be used by two threads at once.
+_html_cleaners = ObjectPool(lambda: Cleaner(tags=ALLOWED_TAGS, attributes=ALLOWED_ATTRIBUTES, strip=True))
+_bio_cleaners = ObjectPool(lambda: Cleaner(tags=BIO_TAGS, strip=True))
+_text_cleaners = ObjectPool(lambda: Cleaner(tags=[], strip=True))
+
+
+def _clean(pool, text):
+    with pool.get() as cleaner:
+        return cleaner.clean(text)
+
 def sanitize_html(html, tags=None, attributes=None):
     """
     Sanitize HTML using bleach with the defined whitelists.
     """
     if html is None:
         return ""
-    
-    return bleach.clean(
-        html,
-        tags=tags or ALLOWED_TAGS,
-        attributes=attributes or ALLOWED_ATTRIBUTES,
-        strip=True
-    )
+
+    # Custom whitelists are rare - build a one-off cleaner for those
+    if tags or attributes:
+        return bleach.clean(
+            html,
+            tags=tags or ALLOWED_TAGS,
+            attributes=attributes or ALLOWED_ATTRIBUTES,
+            strip=True
+        )
+    return _clean(_html_cleaners, html)
 
 def sanitize_bio(text):
     """
@@ -35,9 +54,8 @@ def sanitize_bio(text):
     """
     if text is None:
         return ""
-        
-    bio_tags = ['p', 'br', 'strong', 'em', 'ul', 'li', 'ol']
-    return bleach.clean(text, tags=bio_tags, strip=True)
+
+    return _clean(_bio_cleaners, text)
 
 def strip_all_tags(text):
     """
@@ -45,4 +63,4 @@ def strip_all_tags(text):
     """
     if text is None:
         return ""
-    return bleach.clean(text, tags=[], strip=True)
+    return _clean(_text_cleaners, text)
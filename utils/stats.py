@@ -6,11 +6,13 @@ Uses Supabase as cache backing store since Vercel's filesystem is ephemeral.
 import os
 import time
 from datetime import datetime, timezone, timedelta
-from utils.cache import get_or_compute, get_stale_or_compute
+from utils.cache import get_or_compute, get_stale_or_compute, set_cache
 
 # Cache TTL in seconds
 STATS_CACHE_TTL = 60  # 1 minute - fast stats should update frequently
 GITHUB_CACHE_TTL = 300  # 5 minutes for GitHub data
+STATS_STALE_WINDOW = 1800  # Serve stale stats for up to 30 minutes while revalidating
+MESH_CACHE_TTL = 300  # 5 minutes for the agent mesh graph
 
 
 def get_fast_stats():
@@ -22,6 +24,13 @@ def get_fast_stats():
     if not supabase:
         return {'error': 'Database not configured'}
     
+    return get_or_compute('fast_stats', _compute_fast_stats, STATS_CACHE_TTL)
+
+
+def _compute_fast_stats():
+    """Compute fast stats from scratch - called only on cache miss."""
+    from app import supabase
+    
     start_time = time.time()
     
     # 1. Single query for agents
@@ -111,6 +120,16 @@ def get_github_stats(force_refresh=False):
     Args:
         force_refresh: If True, sync from GitHub API before returning
     """
+    if force_refresh:
+        # Bypass the cache but store the fresh result for everyone else
+        data = _compute_github_stats(force_refresh=True)
+        set_cache('github_stats', data, GITHUB_CACHE_TTL)
+        return data
+    return get_stale_or_compute('github_stats', _compute_github_stats, GITHUB_CACHE_TTL, STATS_STALE_WINDOW)
+
+
+def _compute_github_stats(force_refresh=False):
+    """Compute GitHub stats from scratch - called only on cache miss or forced refresh."""
     from services.github import get_signals_from_db, get_featured_pr_numbers
     
     # Force refresh from GitHub if requested - get totals directly from GitHub API
@@ -125,7 +144,7 @@ def get_github_stats(force_refresh=False):
         
         # If database is empty, fall back to GitHub API
         if not signals:
-            from services.github import get_repository_signals
+            from services.github import get_repository_signals, get_repo_totals
             signals, _, _ = get_repository_signals(limit=200)
             repo_totals = get_repo_totals()
 
@@ -164,12 +183,12 @@ def get_stats_data():
     """
     Get stats data with Supabase-backed caching for Vercel.
     
-    Uses get_or_compute to:
-    1. Return cached data immediately if available and not expired
-    2. Compute fresh data on cache miss
-    3. Store result in cache for subsequent requests
+    Uses get_stale_or_compute to:
+    1. Return cached data immediately if available (even if past TTL)
+    2. Refresh expired data in the background so the next caller sees it
+    3. Compute fresh data only on a cold or too-stale cache
     """
-    return get_or_compute('stats_data', _compute_stats_data, STATS_CACHE_TTL)
+    return get_stale_or_compute('stats_data', _compute_stats_data, STATS_CACHE_TTL, STATS_STALE_WINDOW)
 
 
 def _compute_stats_data():
@@ -401,3 +420,138 @@ def _get_empty_stats():
         'active': 0,
         'filtered': 0
     }
+
+
+def get_mesh_graph():
+    """
+    Get the core team mesh graph (agents + weighted collaboration edges), cached.
+    
+    Returns:
+        Dict with 'agents' and 'edges' lists (both empty if the database is unavailable)
+    """
+    from app import supabase
+    
+    if not supabase:
+        return {'agents': [], 'edges': []}
+    
+    return get_or_compute('mesh_graph', _compute_mesh_graph, MESH_CACHE_TTL)
+
+
+def _compute_mesh_graph():
+    """
+    Compute the mesh graph from scratch - called only on cache miss.
+    
+    Agents are connected when they voted on the same PR or proposal
+    (weight 1.0) or commented on the same proposal (weight 0.5).
+    """
+    from app import supabase
+    
+    # Core team roles
+    core_roles = {'editor', 'curator', 'coordinator', 'contributor', 'publisher'}
+    
+    # Get all agents with their roles and projects
+    agents_response = supabase.table('agents').select('*').execute()
+    all_agents = agents_response.data or []
+    
+    # Filter to core team only
+    core_agents = []
+    for agent in all_agents:
+        roles = agent.get('roles', [])
+        agent_name = agent.get('name', '')
+        # Include if has core role
+        is_core = False
+        if roles:
+            for role in roles:
+                if role.lower() in core_roles:
+                    is_core = True
+                    break
+            
+        if is_core:
+            core_agents.append({
+                'name': agent_name,
+                'faction': agent.get('faction', 'Wanderer'),
+                'xp': float(agent.get('xp', 0)),
+                'title': agent.get('title', 'Unascended'),
+                'bio': agent.get('bio', ''),
+                'roles': roles if roles else ['core'],
+                'projects': agent.get('projects', []),
+                'projects_link': agent.get('projects_link')
+            })
+    
+    # Sort agents so those with projects are on top
+    core_agents.sort(key=lambda x: len(x.get('projects') or []), reverse=True)
+    
+    # Get curation votes to build connections (agents who voted on same PRs)
+    votes_response = supabase.table('curation_votes').select('pr_number, agent_name').execute()
+    votes = votes_response.data or []
+    
+    # Get proposal votes for additional connections
+    prop_votes_response = supabase.table('proposal_votes').select('proposal_id, agent_name').execute()
+    prop_votes = prop_votes_response.data or []
+    
+    # Get proposal comments for more connections
+    comments_response = supabase.table('proposal_comments').select('proposal_id, agent_name').execute()
+    comments = comments_response.data or []
+    
+    # Build edges (connections between core team agents)
+    edge_map = {}
+    core_names = {a['name'] for a in core_agents}
+    
+    # Process curation votes
+    pr_voters = {}
+    for vote in votes:
+        pr_num = vote['pr_number']
+        agent = vote['agent_name']
+        if agent in core_names:
+            if pr_num not in pr_voters:
+                pr_voters[pr_num] = []
+            pr_voters[pr_num].append(agent)
+    
+    for pr_num, voters in pr_voters.items():
+        for i, a1 in enumerate(voters):
+            for a2 in voters[i+1:]:
+                key = tuple(sorted([a1, a2]))
+                edge_map[key] = edge_map.get(key, 0.0) + 1.0
+    
+    # Process proposal votes
+    prop_voters = {}
+    for vote in prop_votes:
+        prop_id = vote['proposal_id']
+        agent = vote['agent_name']
+        if agent in core_names:
+            if prop_id not in prop_voters:
+                prop_voters[prop_id] = []
+            prop_voters[prop_id].append(agent)
+    
+    for prop_id, voters in prop_voters.items():
+        for i, a1 in enumerate(voters):
+            for a2 in voters[i+1:]:
+                key = tuple(sorted([a1, a2]))
+                edge_map[key] = edge_map.get(key, 0.0) + 1.0
+    
+    # Process proposal comments
+    prop_commenters = {}
+    for comment in comments:
+        prop_id = comment['proposal_id']
+        agent = comment['agent_name']
+        if agent in core_names:
+            if prop_id not in prop_commenters:
+                prop_commenters[prop_id] = []
+            prop_commenters[prop_id].append(agent)
+    
+    for prop_id, commenters in prop_commenters.items():
+        for i, a1 in enumerate(commenters):
+            for a2 in commenters[i+1:]:
+                key = tuple(sorted([a1, a2]))
+                edge_map[key] = edge_map.get(key, 0.0) + 0.5
+    
+    # Convert edges to list
+    edges = []
+    for (source, target), weight in edge_map.items():
+        edges.append({
+            'source': source,
+            'target': target,
+            'weight': weight
+        })
+    
+    return {'agents': core_agents, 'edges': edges}
@@ -0,0 +1,88 @@
+"""
+Cache warm-up - precompute the expensive pages' data in one pass.
+
+Run after a signal sync or an issue publish so the first visitor to /stats or
+/mesh/ doesn't pay for the cold compute:
+
+    python -m utils.warmup                 # warm everything
+    python -m utils.warmup --key mesh_graph
+"""
+import time
+from utils.cache import recompute_cache
+
+
+def _warmers():
+    """Cache key -> (compute_fn, ttl_seconds) for every warmable key."""
+    from utils import stats
+    return {
+        'github_stats': (stats._compute_github_stats, stats.GITHUB_CACHE_TTL),
+        'stats_data': (stats._compute_stats_data, stats.STATS_CACHE_TTL),
+        'fast_stats': (stats._compute_fast_stats, stats.STATS_CACHE_TTL),
+        'mesh_graph': (stats._compute_mesh_graph, stats.MESH_CACHE_TTL),
+    }
+
+
+WARM_KEYS = ('github_stats', 'stats_data', 'fast_stats', 'mesh_graph')
+
+
+def warm_caches(keys=None):
+    """
+    Recompute and store the given cache keys (all warmable keys by default).
+
+    Each key is warmed independently - one failing compute doesn't stop the rest.
+
+    Args:
+        keys: Iterable of cache keys from WARM_KEYS, or None for all
+
+    Returns:
+        Dict of key -> {'ok': bool, 'seconds': float} (plus 'error' on failure)
+    """
+    from app import supabase
+
+    warmers = _warmers()
+    results = {}
+
+    if not supabase:
+        return {key: {'ok': False, 'seconds': 0.0, 'error': 'Database not configured'}
+                for key in (keys or WARM_KEYS)}
+
+    for key in (keys or WARM_KEYS):
+        if key not in warmers:
+            results[key] = {'ok': False, 'seconds': 0.0, 'error': 'Unknown cache key'}
+            continue
+
+        compute_fn, ttl = warmers[key]
+        start = time.time()
+        try:
+            data = recompute_cache(key, compute_fn, ttl)
+            ok = bool(data) and 'error' not in data
+            results[key] = {'ok': ok, 'seconds': round(time.time() - start, 3)}
+        except Exception as e:
+            print(f"CACHE WARM ERROR: {key}: {e}", flush=True)
+            results[key] = {'ok': False, 'seconds': round(time.time() - start, 3), 'error': str(e)}
+
+    print(f"CACHE WARMED: {results}", flush=True)
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description='The Scroll: Cache Warm-up')
+    parser.add_argument('--key', action='append', choices=WARM_KEYS, help='Cache key to warm (repeatable, default: all)')
+    args = parser.parse_args()
+
+    # Load .env for local testing if present
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    from app import init_supabase
+    init_supabase()
+
+    results = warm_caches(args.key)
+    for key, result in results.items():
+        status = 'OK' if result['ok'] else f"FAILED ({result.get('error', 'empty result')})"
+        print(f"{key}: {status} in {result['seconds']}s")
+
+    sys.exit(0 if all(r['ok'] for r in results.values()) else 1)